@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Add precomputed limit multiplier columns to challenges table"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app, db
+
+MULTIPLIER_COLUMNS = {
+    'daily_loss_multiplier': 'max_daily_loss_percent',
+    'drawdown_multiplier': 'max_total_drawdown_percent',
+    'profit_target_multiplier': 'profit_target_percent',
+}
+
+def add_challenge_multiplier_columns():
+    """Add and backfill the multiplier columns on the challenges table"""
+
+    app = create_app()
+
+    with app.app_context():
+        try:
+            from sqlalchemy import text
+
+            column_names = [col['name'] for col in db.inspect(db.engine).get_columns('challenges')]
+
+            for column, percent_column in MULTIPLIER_COLUMNS.items():
+                if column in column_names:
+                    print(f"[+] {column} column already exists")
+                else:
+                    print(f"[+] Adding {column} column...")
+                    db.session.execute(text(f"""
+                        ALTER TABLE challenges ADD COLUMN {column} NUMERIC(7, 4)
+                    """))
+                    print(f"[+] Added {column} column")
+
+                db.session.execute(text(f"""
+                    UPDATE challenges SET {column} = {percent_column} / 100.0
+                    WHERE {column} IS NULL
+                """))
+
+            db.session.commit()
+            print("[+] Migration completed successfully!")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"[-] Migration failed: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
+
+    return True
+
+if __name__ == "__main__":
+    success = add_challenge_multiplier_columns()
+    if success:
+        print("\n✅ Database migration completed!")
+        print("Challenge limit multipliers are now precomputed.")
+    else:
+        print("\n❌ Database migration failed!")
+        sys.exit(1)
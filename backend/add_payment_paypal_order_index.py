@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Add an index on payments.paypal_order_id"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app, db
+
+def add_paypal_order_id_index():
+    """Create ix_payments_paypal_order_id used by PayPal capture callbacks"""
+
+    app = create_app()
+
+    with app.app_context():
+        try:
+            from sqlalchemy import text
+
+            # For SQLite, use PRAGMA index_list to check existing indexes
+            result = db.session.execute(text("PRAGMA index_list(payments)"))
+            index_names = [row[1] for row in result.fetchall()]  # row[1] is the index name
+
+            if 'ix_payments_paypal_order_id' in index_names:
+                print("[+] ix_payments_paypal_order_id index already exists")
+            else:
+                print("[+] Adding ix_payments_paypal_order_id index...")
+                db.session.execute(text("""
+                    CREATE INDEX ix_payments_paypal_order_id ON payments (paypal_order_id)
+                """))
+                print("[+] Added ix_payments_paypal_order_id index")
+
+            db.session.commit()
+            print("[+] Migration completed successfully!")
+
+        except Exception as e:
+            db.session.rollback()
+            print(f"[-] Migration failed: {e}")
+            import traceback
+            traceback.print_exc()
+            return False
+
+    return True
+
+if __name__ == "__main__":
+    success = add_paypal_order_id_index()
+    if success:
+        print("\n✅ Database migration completed!")
+        print("PayPal capture lookups by order id are now indexed.")
+    else:
+        print("\n❌ Database migration failed!")
+        sys.exit(1)
@@ -21,6 +21,9 @@ class Config:
     PAYPAL_CLIENT_SECRET = os.environ.get('PAYPAL_CLIENT_SECRET') or ''
     PAYPAL_MODE = os.environ.get('PAYPAL_MODE') or 'sandbox'  # sandbox or live
     
+    # Simulated processing time for the mock CMI/crypto/PayPal gateways (seconds)
+    MOCK_PAYMENT_DELAY_SECONDS = float(os.environ.get('MOCK_PAYMENT_DELAY_SECONDS') or 0)
+    
     
     # CORS Configuration
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS') or '*'
@@ -49,6 +52,12 @@ class Config:
     NEWSAPI_BASE_URL = 'https://newsapi.org/v2'
     NEWS_CACHE_TTL = 120  # seconds
 
+    # Shared cache across workers (leave empty to keep per-process caches only)
+    REDIS_URL = os.environ.get('REDIS_URL') or ''
+
+    # Market snapshot storage: 'csv', or 'parquet' (needs pyarrow; falls back to CSV without it)
+    MARKET_DATA_FORMAT = (os.environ.get('MARKET_DATA_FORMAT') or 'csv').lower()
+
 class DevelopmentConfig(Config):
     """Development configuration"""
     DEBUG = True
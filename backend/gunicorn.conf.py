@@ -0,0 +1,11 @@
+"""Gunicorn settings (picked up automatically when gunicorn starts from backend/)"""
+import os
+
+# Threaded workers: a request blocked on PayPal/market HTTP calls no longer ties up
+# the whole worker, other requests keep being served on the remaining threads.
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+# One process by default: create_app starts the ChallengeScheduler thread in every
+# worker, so more workers would scrape and evaluate challenges once per process
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
@@ -1,7 +1,9 @@
 from datetime import datetime
+from decimal import Decimal
 from werkzeug.security import generate_password_hash, check_password_hash
 from extensions import db
 from sqlalchemy import func
+from sqlalchemy.orm import validates
 
 class User(db.Model):
     """User model"""
@@ -62,9 +64,27 @@ class Challenge(db.Model):
     is_active = db.Column(db.Boolean, default=True, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     
+    # Percent / 100, kept in sync by _sync_multiplier
+    daily_loss_multiplier = db.Column(db.Numeric(7, 4), nullable=False, default=0.05)
+    drawdown_multiplier = db.Column(db.Numeric(7, 4), nullable=False, default=0.10)
+    profit_target_multiplier = db.Column(db.Numeric(7, 4), nullable=False, default=0.10)
+    
     # Relationships
     user_challenges = db.relationship('UserChallenge', back_populates='challenge', lazy='dynamic')
     
+    _MULTIPLIER_COLUMNS = {
+        'max_daily_loss_percent': 'daily_loss_multiplier',
+        'max_total_drawdown_percent': 'drawdown_multiplier',
+        'profit_target_percent': 'profit_target_multiplier',
+    }
+    
+    @validates('max_daily_loss_percent', 'max_total_drawdown_percent', 'profit_target_percent')
+    def _sync_multiplier(self, key, value):
+        """Precompute the matching multiplier whenever a percent field is set"""
+        if value is not None:
+            setattr(self, self._MULTIPLIER_COLUMNS[key], Decimal(str(value)) / 100)
+        return value
+    
     def to_dict(self):
         """Convert to dictionary"""
         return {
@@ -179,7 +199,7 @@ class Payment(db.Model):
     payment_method = db.Column(db.String(50), nullable=False)  # cmi, crypto, paypal
     status = db.Column(db.String(50), default='pending', nullable=False)  # pending, completed, failed
     transaction_id = db.Column(db.String(255), unique=True, nullable=True)
-    paypal_order_id = db.Column(db.String(255), nullable=True)
+    paypal_order_id = db.Column(db.String(255), nullable=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     completed_at = db.Column(db.DateTime, nullable=True)
     
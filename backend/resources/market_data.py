@@ -213,12 +213,12 @@ def apply_timeframe_filter(historical_data, timeframe):
         except (ValueError, KeyError):
             continue
 
-    # Keep most recent data points
-    filtered_data.sort(key=lambda x: x['date'], reverse=True)
-    result = filtered_data[:max_points]
-    result.sort(key=lambda x: x['date'])  # Oldest first for charts
+    # Generated and stored history is already oldest first; only sort when it is not
+    if any(filtered_data[i]['date'] > filtered_data[i + 1]['date'] for i in range(len(filtered_data) - 1)):
+        filtered_data.sort(key=lambda x: x['date'])
 
-    return result
+    # Keep most recent data points, oldest first for charts
+    return filtered_data[-max_points:]
 
 @market_data_bp.route('/history/<symbol>', methods=['GET'])
 def get_price_history(symbol):
@@ -248,13 +248,10 @@ def get_price_history(symbol):
         # Try to find symbol in different markets
         for mt in ['stocks', 'forex', 'crypto', 'morocco']:
             test_scraper = BVCscrap(market_type=mt)
-            data = test_scraper.read_from_csv()
-            for item in data:
-                if item['symbol'].upper() == symbol:
-                    market_type = mt
-                    scraper = test_scraper
-                    break
-            if market_type:
+            current_price_data = test_scraper.find_symbol(symbol)
+            if current_price_data:
+                market_type = mt
+                scraper = test_scraper
                 break
 
         if not market_type:
@@ -281,14 +278,8 @@ def get_price_history(symbol):
             else:
                 return jsonify({'error': 'Failed to generate historical data'}), 500
 
-        # Get current price info
-        current_data = scraper.read_from_csv()
-        current_price_data = None
-        for item in current_data:
-            if item['symbol'].upper() == symbol:
-                current_price_data = item
-                break
-
+        # Get current price info (indexed lookup; picks up a refresh during generation)
+        current_price_data = scraper.find_symbol(symbol)
         current_price = float(current_price_data.get('price', 0)) if current_price_data else 0
         change_percent = float(current_price_data.get('change_percent', 0)) if current_price_data else 0
 
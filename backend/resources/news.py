@@ -1,10 +1,19 @@
-from flask import Blueprint
+import logging
+from flask import Blueprint, Response, jsonify, request
+from flask_jwt_extended import get_jwt_identity, jwt_required
+from services.news_service import NewsService
+
+logger = logging.getLogger(__name__)
 
 news_bp = Blueprint('news', __name__)
 
 @news_bp.route('/ping')
 def ping():
     return {'status': 'news blueprint working'}
+
+@news_bp.route('', methods=['GET'])
+@jwt_required(optional=True)
+def get_news():
     """
     Get financial news with optional filtering
 
@@ -40,19 +49,15 @@ def ping():
 
         # Initialize news service and fetch news
         news_service = NewsService()
-        news_data = news_service.get_financial_news(
+        # Cached payload is already JSON-encoded; user context is spliced in without re-encoding
+        payload = news_service.get_financial_news_bytes(
             symbol=symbol,
             category=category,
-            limit=limit
+            limit=limit,
+            extra={'user_authenticated': user_id is not None, 'user_id': user_id}
         )
 
-        # Add user context to response
-        news_data['user_authenticated'] = user_id is not None
-        news_data['user_id'] = user_id
-
-        logger.info(f"Returning {news_data.get('total', 0)} news articles")
-
-        return jsonify(news_data), 200
+        return Response(payload, status=200, mimetype='application/json')
 
     except Exception as e:
         logger.error(f"Error fetching news: {e}")
@@ -28,7 +28,10 @@ def process_cmi_payment():
         
         # Create user challenge
         challenge_engine = ChallengeEngine()
-        user_challenge = challenge_engine.create_user_challenge(user.id, challenge_id)
+        user_challenge = challenge_engine.create_user_challenge(user.id, challenge_id, commit=False)
+        
+        # Payment and user challenge are durable before the client sees success
+        db.session.commit()
         
         return jsonify({
             'message': 'Payment processed successfully',
@@ -36,6 +39,8 @@ def process_cmi_payment():
             'challenge': user_challenge.to_dict()
         }), 201
     except Exception as e:
+        # Drop anything flushed before the error
+        db.session.rollback()
         return jsonify({'error': str(e)}), 400
 
 @payments_bp.route('/process/crypto', methods=['POST'])
@@ -58,7 +63,10 @@ def process_crypto_payment():
         
         # Create user challenge
         challenge_engine = ChallengeEngine()
-        user_challenge = challenge_engine.create_user_challenge(user.id, challenge_id)
+        user_challenge = challenge_engine.create_user_challenge(user.id, challenge_id, commit=False)
+        
+        # Payment and user challenge are durable before the client sees success
+        db.session.commit()
         
         return jsonify({
             'message': 'Payment processed successfully',
@@ -66,6 +74,8 @@ def process_crypto_payment():
             'challenge': user_challenge.to_dict()
         }), 201
     except Exception as e:
+        # Drop anything flushed before the error
+        db.session.rollback()
         return jsonify({'error': str(e)}), 400
 
 @payments_bp.route('/paypal/create', methods=['POST'])
@@ -85,12 +95,15 @@ def create_paypal_order():
     try:
         payment_service = PaymentService()
         order_data = payment_service.create_paypal_order(user.id, challenge_id)
+        db.session.commit()
         
         return jsonify({
             'message': 'PayPal order created',
             **order_data
         }), 201
     except Exception as e:
+        # Drop anything flushed before the error
+        db.session.rollback()
         return jsonify({'error': str(e)}), 400
 
 @payments_bp.route('/paypal/capture', methods=['POST'])
@@ -119,7 +132,8 @@ def capture_paypal_order():
         # Create user challenge if payment completed
         if payment.status == 'completed':
             challenge_engine = ChallengeEngine()
-            user_challenge = challenge_engine.create_user_challenge(user.id, payment.challenge_id)
+            user_challenge = challenge_engine.create_user_challenge(user.id, payment.challenge_id, commit=False)
+            db.session.commit()
             
             return jsonify({
                 'message': 'Payment captured successfully',
@@ -127,11 +141,14 @@ def capture_paypal_order():
                 'challenge': user_challenge.to_dict()
             }), 200
         else:
+            db.session.commit()
             return jsonify({
                 'message': 'Payment capture initiated',
                 'payment': payment.to_dict()
             }), 200
     except Exception as e:
+        # Drop anything flushed before the error
+        db.session.rollback()
         return jsonify({'error': str(e)}), 400
 
 @payments_bp.route('/history', methods=['GET'])
@@ -74,7 +74,7 @@ def buy_trade():
     
     # Update challenge equity (reserve the cost)
     new_equity = user_challenge.equity - total_cost
-    challenge_engine.update_equity(user_challenge.id, new_equity)
+    challenge_engine.update_equity(user_challenge.id, new_equity, commit=False)
     
     db.session.add(trade)
     db.session.commit()
@@ -156,7 +156,7 @@ def sell_trade():
     challenge_engine = ChallengeEngine()
     reserved_amount = trade.entry_price * trade.quantity
     new_equity = user_challenge.equity + reserved_amount + pnl
-    challenge_engine.update_equity(user_challenge.id, new_equity)
+    challenge_engine.update_equity(user_challenge.id, new_equity, commit=False)
     
     db.session.commit()
     
@@ -1,5 +1,7 @@
-from datetime import datetime
+from functools import lru_cache
+from types import SimpleNamespace
 import random
+from utils.clock import now_iso
 
 class AISignalsService:
     """AI signals service (mock implementation)"""
@@ -23,7 +25,7 @@ class AISignalsService:
             'signal': signal,
             'confidence': confidence,
             'risk_level': risk_level,
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': now_iso(),
             'reason': self._generate_reason(signal)
         }
     
@@ -54,31 +56,56 @@ class AISignalsService:
     def get_risk_alerts(self, user_challenge_id):
         """Get risk alerts for a user challenge"""
         from models import UserChallenge
-        from services.risk_engine import RiskEngine
         
         user_challenge = UserChallenge.query.get(user_challenge_id)
         if not user_challenge:
             return []
         
+        # Alerts depend only on these fields, so unchanged state is a cache hit
+        alerts = self._compute_alerts(
+            user_challenge.initial_balance,
+            user_challenge.equity,
+            user_challenge.peak_balance,
+            user_challenge.daily_loss,
+            user_challenge.daily_loss_limit
+        )
+        
+        return [
+            {'type': alert_type, 'message': message, 'severity': severity}
+            for alert_type, message, severity in alerts
+        ]
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _compute_alerts(initial_balance, equity, peak_balance, daily_loss, daily_loss_limit):
+        """Compute risk alerts as a tuple of (type, message, severity) tuples"""
+        from services.risk_engine import RiskEngine
+        
         risk_engine = RiskEngine()
-        metrics = risk_engine.calculate_risk_metrics(user_challenge)
+        metrics = risk_engine.calculate_risk_metrics(SimpleNamespace(
+            initial_balance=initial_balance,
+            equity=equity,
+            peak_balance=peak_balance,
+            daily_loss=daily_loss,
+            daily_loss_limit=daily_loss_limit
+        ))
         
         alerts = []
         
         # Daily loss alert
         if metrics['daily_loss_percent'] > 80:
-            alerts.append({
-                'type': 'warning',
-                'message': f"Daily loss limit at {metrics['daily_loss_percent']:.1f}%",
-                'severity': 'high' if metrics['daily_loss_percent'] > 90 else 'medium'
-            })
+            alerts.append((
+                'warning',
+                f"Daily loss limit at {metrics['daily_loss_percent']:.1f}%",
+                'high' if metrics['daily_loss_percent'] > 90 else 'medium'
+            ))
         
         # Drawdown alert
         if metrics['drawdown_percent'] > 8:
-            alerts.append({
-                'type': 'warning',
-                'message': f"Drawdown at {metrics['drawdown_percent']:.1f}%",
-                'severity': 'high' if metrics['drawdown_percent'] > 9 else 'medium'
-            })
+            alerts.append((
+                'warning',
+                f"Drawdown at {metrics['drawdown_percent']:.1f}%",
+                'high' if metrics['drawdown_percent'] > 9 else 'medium'
+            ))
         
-        return alerts
+        return tuple(alerts)
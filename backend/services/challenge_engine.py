@@ -1,51 +1,90 @@
+from collections import OrderedDict
 from datetime import datetime
+import threading
 from extensions import db
 from models import UserChallenge, Challenge
 
 class ChallengeEngine:
     """Challenge management engine"""
     
-    def create_user_challenge(self, user_id, challenge_id):
+    # Per-worker LRU of user_id -> active user challenge id
+    _active_by_user = OrderedDict()
+    _active_by_user_size = 4096
+    _active_by_user_lock = threading.Lock()
+    
+    def _build_user_challenge(self, challenge_template, user_id, today):
+        """Build an unsaved user challenge from a template"""
+        initial_balance = challenge_template.initial_balance
+        return UserChallenge(
+            user_id=user_id,
+            challenge_id=challenge_template.id,
+            status='active',
+            initial_balance=initial_balance,
+            current_balance=initial_balance,
+            equity=initial_balance,
+            peak_balance=initial_balance,
+            daily_loss_limit=initial_balance * challenge_template.daily_loss_multiplier,
+            max_drawdown_limit=initial_balance * challenge_template.drawdown_multiplier,
+            profit_target=initial_balance * challenge_template.profit_target_multiplier,
+            current_day=today,
+            daily_loss=0.0
+        )
+    
+    def _save(self, commit):
+        """Commit the session, or only flush it when the caller owns the commit"""
+        if commit:
+            db.session.commit()
+        else:
+            db.session.flush()
+    
+    def create_user_challenge(self, user_id, challenge_id, commit=True):
         """Create a new user challenge instance"""
         challenge_template = Challenge.query.get(challenge_id)
         if not challenge_template:
             raise ValueError("Challenge template not found")
         
-        user_challenge = UserChallenge(
-            user_id=user_id,
-            challenge_id=challenge_id,
-            status='active',
-            initial_balance=challenge_template.initial_balance,
-            current_balance=challenge_template.initial_balance,
-            equity=challenge_template.initial_balance,
-            peak_balance=challenge_template.initial_balance,
-            daily_loss_limit=challenge_template.initial_balance * (challenge_template.max_daily_loss_percent / 100),
-            max_drawdown_limit=challenge_template.initial_balance * (challenge_template.max_total_drawdown_percent / 100),
-            profit_target=challenge_template.initial_balance * (challenge_template.profit_target_percent / 100),
-            current_day=datetime.utcnow().date(),
-            daily_loss=0.0
-        )
+        user_challenge = self._build_user_challenge(challenge_template, user_id, datetime.utcnow().date())
         
         db.session.add(user_challenge)
-        db.session.commit()
+        self._save(commit)
         
         return user_challenge
     
-    def update_challenge_status(self, user_challenge_id, status, reason=None):
+    def create_user_challenges_bulk(self, user_ids, challenge_id):
+        """Create user challenge instances for many users in one batch"""
+        challenge_template = Challenge.query.get(challenge_id)
+        if not challenge_template:
+            raise ValueError("Challenge template not found")
+        
+        today = datetime.utcnow().date()
+        user_challenges = [
+            self._build_user_challenge(challenge_template, user_id, today)
+            for user_id in user_ids
+        ]
+        
+        # add_all (not bulk_save_objects) so the returned objects get their primary keys
+        db.session.add_all(user_challenges)
+        db.session.commit()
+        
+        return user_challenges
+    
+    def update_challenge_status(self, user_challenge_id, status, reason=None, commit=True):
         """Update challenge status"""
         user_challenge = UserChallenge.query.get(user_challenge_id)
         if not user_challenge:
             raise ValueError("User challenge not found")
         
         user_challenge.status = status
+        with self._active_by_user_lock:
+            self._active_by_user.pop(user_challenge.user_id, None)
         if status in ['passed', 'failed']:
             user_challenge.completed_at = datetime.utcnow()
         
-        db.session.commit()
+        self._save(commit)
         
         return user_challenge
     
-    def update_equity(self, user_challenge_id, new_equity):
+    def update_equity(self, user_challenge_id, new_equity, commit=True):
         """Update challenge equity and related fields"""
         user_challenge = UserChallenge.query.get(user_challenge_id)
         if not user_challenge:
@@ -72,13 +111,34 @@ class ChallengeEngine:
             daily_pnl = new_equity - old_equity
             user_challenge.daily_loss = abs(min(0, daily_pnl))
         
-        db.session.commit()
+        self._save(commit)
         
         return user_challenge
     
     def get_active_challenge(self, user_id):
         """Get user's active challenge"""
-        return UserChallenge.query.filter_by(
+        with self._active_by_user_lock:
+            user_challenge_id = self._active_by_user.get(user_id)
+            if user_challenge_id is not None:
+                self._active_by_user.move_to_end(user_id)
+        
+        if user_challenge_id is not None:
+            # Primary-key get is served from the session identity map when possible
+            user_challenge = UserChallenge.query.get(user_challenge_id)
+            if user_challenge and user_challenge.status == 'active':
+                return user_challenge
+            with self._active_by_user_lock:
+                self._active_by_user.pop(user_id, None)
+        
+        user_challenge = UserChallenge.query.filter_by(
             user_id=user_id,
             status='active'
         ).first()
+        
+        if user_challenge:
+            with self._active_by_user_lock:
+                self._active_by_user[user_id] = user_challenge.id
+                if len(self._active_by_user) > self._active_by_user_size:
+                    self._active_by_user.popitem(last=False)
+        
+        return user_challenge
@@ -1,7 +1,8 @@
 """Demo stock data as fallback when API calls fail"""
-from datetime import datetime
+from types import MappingProxyType
+from utils.clock import now_iso
 
-DEMO_STOCKS = [
+DEMO_STOCKS = tuple(MappingProxyType({**row, 'symbol': row['symbol'].upper()}) for row in [
     {'symbol': 'AAPL', 'price': 195.89, 'change': 2.34, 'change_percent': 1.21, 'source': 'demo'},
     {'symbol': 'MSFT', 'price': 378.85, 'change': -1.23, 'change_percent': -0.32, 'source': 'demo'},
     {'symbol': 'GOOGL', 'price': 140.25, 'change': 3.45, 'change_percent': 2.52, 'source': 'demo'},
@@ -32,9 +33,9 @@ DEMO_STOCKS = [
     {'symbol': 'ABBV', 'price': 175.89, 'change': 2.45, 'change_percent': 1.41, 'source': 'demo'},
     {'symbol': 'CSCO', 'price': 53.21, 'change': 0.67, 'change_percent': 1.27, 'source': 'demo'},
     {'symbol': 'ADBE', 'price': 585.67, 'change': 12.34, 'change_percent': 2.15, 'source': 'demo'},
-]
+])
 
 def get_demo_stocks_with_timestamp():
-    """Return demo stocks with current timestamp"""
-    now = datetime.utcnow().isoformat()
-    return [{**stock, 'timestamp': now} for stock in DEMO_STOCKS]
+    """Return demo stocks with current timestamp (fresh rows, so callers may mutate them)"""
+    ts = now_iso()
+    return [{**row, 'timestamp': ts} for row in DEMO_STOCKS]
@@ -4,13 +4,19 @@ from datetime import datetime
 import time
 import json
 import re
+import logging
+import threading
 from config import Config
+from utils.redis_cache import cache_get, cache_set
+
+logger = logging.getLogger(__name__)
 
 class MarketService:
     """Market data service for fetching prices"""
     
-    # Cache for market data
-    _cache = {}
+    # Snapshot of screener data keyed by upper-cased symbol
+    _snapshot = {}
+    _snapshot_time = 0
     _cache_timeout = 30  # seconds
     _symbols_cache = None
     _symbols_cache_time = 0
@@ -19,6 +25,29 @@ class MarketService:
     _screener_cache_time = 0
     _screener_cache_timeout = 60  # Cache screener data for 60 seconds
     
+    # Single-flight guards so only one thread refreshes each cache at a time
+    _snapshot_lock = threading.Lock()
+    _snapshot_event = threading.Event()
+    _symbols_lock = threading.Lock()
+    _symbols_event = threading.Event()
+    _symbols_url = "https://raw.githubusercontent.com/rreichel3/US-Stock-Symbols/master/all/all_tickers.txt"
+    
+    # Redis keys for the caches shared across gunicorn workers
+    _snapshot_key = "mkt:screener:v1"
+    _symbols_key = "mkt:symbols:v1"
+    
+    def _refresh_once(self, lock, event, refresh, cached):
+        """Run refresh in one thread; concurrent callers wait briefly and reuse the cache"""
+        if lock.acquire(blocking=False):
+            try:
+                event.clear()
+                return refresh()
+            finally:
+                event.set()
+                lock.release()
+        event.wait(timeout=5)
+        return cached()
+    
     def _fetch_tradingview_screener(self):
         """Fetch top 30 international stocks from CSV file (refreshed by scheduler)."""
         # Read from CSV file first (updated every minute by scheduler)
@@ -27,49 +56,55 @@ class MarketService:
             scraper = BVCscrap(market_type='stocks')
             csv_data = scraper.read_from_csv()
             if csv_data:
-                print(f"[MarketService] Loaded {len(csv_data)} stocks from CSV")
+                logger.debug("[MarketService] Loaded %d stocks from CSV", len(csv_data))
                 return csv_data
         except Exception as e:
-            print(f"[MarketService] Error reading from CSV: {e}")
+            logger.exception("[MarketService] Error reading from CSV: %s", e)
         
         # Fallback to cache if CSV read fails
         current_time = time.time()
         if self._screener_cache and (current_time - self._screener_cache_time) < self._screener_cache_timeout:
-            print("[MarketService] Using cached data")
+            logger.debug("[MarketService] Using cached data")
             return self._screener_cache
         
         # If CSV read failed, try demo data as fallback
-        print("[MarketService] CSV read failed, trying demo data fallback")
+        logger.warning("[MarketService] CSV read failed, trying demo data fallback")
         try:
             from services.demo_stocks import get_demo_stocks_with_timestamp
             demo_data = get_demo_stocks_with_timestamp()
-            print(f"[MarketService] Using {len(demo_data)} demo stocks as fallback")
+            logger.debug("[MarketService] Using %d demo stocks as fallback", len(demo_data))
             return demo_data
         except ImportError:
-            print("[MarketService] Could not import demo stocks fallback")
+            logger.exception("[MarketService] Could not import demo stocks fallback")
             return []
     
+    def _load_snapshot(self):
+        """Rebuild the symbol -> stock snapshot from screener data"""
+        # Symbols are normalized once here; lookups only upper-case the query
+        # Another worker may already have fetched it; reuse the shared copy
+        snapshot = cache_get(self._snapshot_key)
+        if not snapshot:
+            screener_data = self._fetch_tradingview_screener()
+            snapshot = {stock['symbol'].upper(): stock for stock in screener_data}
+            if snapshot:
+                cache_set(self._snapshot_key, snapshot, self._screener_cache_timeout)
+        MarketService._snapshot = snapshot
+        MarketService._snapshot_time = time.time()
+        return snapshot
+    
+    def _get_snapshot(self):
+        """Return the symbol -> stock snapshot, refreshing it when stale"""
+        if self._snapshot and (time.time() - self._snapshot_time) < self._cache_timeout:
+            return self._snapshot
+        
+        return self._refresh_once(
+            self._snapshot_lock, self._snapshot_event,
+            self._load_snapshot, lambda: MarketService._snapshot
+        )
+    
     def get_international_price(self, symbol):
         """Fetch international stock price using TradingView screener data."""
-        cache_key = f"int_{symbol}"
-        current_time = time.time()
-        
-        # Check cache
-        if cache_key in self._cache:
-            cached_data, cache_time = self._cache[cache_key]
-            if current_time - cache_time < self._cache_timeout:
-                return cached_data
-        
-        # Fetch from TradingView screener (returns multiple stocks)
-        screener_data = self._fetch_tradingview_screener()
-        
-        # Find the requested symbol in screener data
-        for stock in screener_data:
-            if stock['symbol'].upper() == symbol.upper():
-                self._cache[cache_key] = (stock, current_time)
-                return stock
-        
-        return None
+        return self._get_snapshot().get(symbol.upper())
     
     def get_moroccan_stock_price(self, symbol):
         """No Moroccan data source available."""
@@ -81,75 +116,64 @@ class MarketService:
     
     def get_multiple_prices(self, symbols):
         """Get prices for multiple symbols from TradingView screener (all at once)."""
-        # Fetch all screener data once (gets 30 stocks)
-        screener_data = self._fetch_tradingview_screener()
-        
-        # Create a lookup dict
-        screener_dict = {stock['symbol'].upper(): stock for stock in screener_data}
+        snapshot = self._get_snapshot()
         
         results = {}
-        current_time = time.time()
-        
         for sym in symbols:
-            sym_upper = sym.upper()
-            if sym_upper in screener_dict:
-                stock = screener_dict[sym_upper]
-                # Update cache
-                cache_key = f"int_{sym_upper}"
-                self._cache[cache_key] = (stock, current_time)
+            stock = snapshot.get(sym.upper())
+            if stock is not None:
                 results[sym] = stock
         
         return results
 
+    def _load_all_symbols(self):
+        """Download the US-listed symbol list into the class-level cache"""
+        symbols = cache_get(self._symbols_key)
+        if symbols:
+            MarketService._symbols_cache = symbols
+            MarketService._symbols_cache_time = time.time()
+            return symbols
+        
+        try:
+            response = requests.get(self._symbols_url, timeout=15)
+            response.raise_for_status()
+            lines = [line.strip().upper() for line in response.text.splitlines() if line.strip()]
+            symbols = [
+                {
+                    "symbol": ticker,
+                    "name": "",
+                    "exchange": "US"
+                }
+                for ticker in lines
+            ]
+            symbols = sorted(symbols, key=lambda s: s["symbol"])
+            MarketService._symbols_cache = symbols
+            MarketService._symbols_cache_time = time.time()
+            cache_set(self._symbols_key, symbols, self._symbols_cache_ttl)
+            return symbols
+        except Exception:
+            return MarketService._symbols_cache or []
+
     def get_all_symbols(self, query=None, limit=50):
         """Get all US-listed symbols (cached), optionally filtered by query."""
         now = time.time()
         if self._symbols_cache and (now - self._symbols_cache_time) < self._symbols_cache_ttl:
             symbols = self._symbols_cache
         else:
-            try:
-                url = "https://raw.githubusercontent.com/rreichel3/US-Stock-Symbols/master/all/all_tickers.txt"
-                response = requests.get(url, timeout=15)
-                response.raise_for_status()
-                lines = [line.strip().upper() for line in response.text.splitlines() if line.strip()]
-                symbols = [
-                    {
-                        "symbol": ticker,
-                        "name": "",
-                        "exchange": "US"
-                    }
-                    for ticker in lines
-                ]
-                symbols = sorted(symbols, key=lambda s: s["symbol"])
-                self._symbols_cache = symbols
-                self._symbols_cache_time = now
-            except Exception:
-                symbols = self._symbols_cache or []
-
-        # If cache is empty (e.g., previous fetch failed), force refresh once
-        if not symbols:
-            try:
-                url = "https://raw.githubusercontent.com/rreichel3/US-Stock-Symbols/master/all/all_tickers.txt"
-                response = requests.get(url, timeout=15)
-                response.raise_for_status()
-                lines = [line.strip().upper() for line in response.text.splitlines() if line.strip()]
-                symbols = [
-                    {
-                        "symbol": ticker,
-                        "name": "",
-                        "exchange": "US"
-                    }
-                    for ticker in lines
-                ]
-                symbols = sorted(symbols, key=lambda s: s["symbol"])
-                self._symbols_cache = symbols
-                self._symbols_cache_time = now
-            except Exception:
-                symbols = self._symbols_cache or []
+            symbols = self._refresh_once(
+                self._symbols_lock, self._symbols_event,
+                self._load_all_symbols, lambda: MarketService._symbols_cache or []
+            )
 
         if query:
             q = query.upper()
-            symbols = [s for s in symbols if q in s["symbol"]]
+            results = []
+            for s in symbols:
+                if q in s["symbol"]:
+                    results.append(s)
+                    if limit and len(results) >= limit:
+                        break
+            return results
 
         if limit:
             return symbols[:limit]
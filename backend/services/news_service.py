@@ -4,22 +4,208 @@ from datetime import datetime, timedelta
 from flask import current_app
 from typing import List, Dict, Optional, Any
 import logging
-from bs4 import BeautifulSoup
+import threading
+from dataclasses import dataclass, asdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from lxml import etree
+from lxml.etree import XPath
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import re
+import ahocorasick
+import orjson
+from cachetools import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Browser-like headers Investing.com expects; set once on the shared session
+_INVESTING_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+# Pre-compiled extraction paths for Investing.com news cards
+CONTAINER_TAGS = ('article', 'div')
+CONTAINER_CLASSES = ('article', 'news', 'story', 'item')
+# Candidate nodes for each field; the preferred one is picked in a single pass
+TITLE_XP = XPath(".//*[self::h1 or self::h2 or self::h3 or self::a]")
+LINK_XP = XPath("(.//a[@href])[1]/@href")
+SUMMARY_XP = XPath(".//*[self::p or self::div]")
+IMG_XP = XPath("(.//img[@src])[1]/@src")
+TIME_XP = XPath(".//*[self::time or self::span]")
+NEWS_LINK_XP = XPath("//a[contains(@href,'/news/')]")
+
+# Symbols recognised in article text
+NEWS_SYMBOLS = (
+    'AAPL', 'TSLA', 'NVDA', 'GOOGL', 'MSFT', 'META', 'AMZN', 'NFLX',
+    'BTC', 'ETH', 'BNB', 'ADA', 'SOL', 'DOT', 'DOGE', 'SHIB', 'AVAX',
+    'USD', 'EUR', 'GBP', 'JPY', 'CHF', 'CAD', 'AUD',
+    'SPY', 'QQQ', 'IWM', 'VTI', 'VXUS', 'BND', 'VNQ',
+    'XOM', 'CVX', 'COP', 'EOG', 'PXD', 'MPC', 'PSX',
+    'JPM', 'BAC', 'WFC', 'C', 'GS', 'MS', 'DB',
+    'JNJ', 'PFE', 'MRK', 'ABBV', 'BMY', 'LLY',
+    'WMT', 'HD', 'COST', 'TGT', 'LOW',
+    'KO', 'PEP', 'MDLZ', 'MO', 'PM'
+)
+
+# Keyword lists, checked in priority order (first entry wins)
+CATEGORY_KEYWORDS = (
+    ('crypto', ('crypto', 'bitcoin', 'ethereum', 'blockchain', 'nft')),
+    ('forex', ('forex', 'currency', 'dollar', 'euro', 'yen')),
+    ('macro', ('fed', 'federal reserve', 'interest rate', 'inflation', 'economy')),
+    ('earnings', ('earnings', 'quarterly', 'results', 'revenue')),
+    ('technology', ('technology', 'tech', 'software', 'ai', 'artificial')),
+)
+IMPACT_KEYWORDS = (
+    ('high', (
+        'breaking', 'alert', 'emergency', 'crash', 'surge', 'plunge',
+        'bankruptcy', 'collapse', 'crisis', 'recession', 'bear market',
+        'bull market', 'record high', 'record low', 'historic',
+        'federal reserve', 'interest rate decision', 'fomc',
+        'geopolitical', 'war', 'sanctions', 'trade war'
+    )),
+    ('medium', (
+        'earnings', 'quarterly results', 'guidance', 'forecast',
+        'merger', 'acquisition', 'deal', 'partnership',
+        'lawsuit', 'regulation', 'sec', 'fda', 'approval',
+        'upgrade', 'downgrade', 'rating change'
+    )),
+)
+
+# Relative time markers in branch order: (substrings, timedelta unit, default amount)
+_RELATIVE_UNITS = (
+    (('minute', 'min'), 'minutes', 0),
+    (('hour', 'hr'), 'hours', 0),
+    (('day', 'yesterday'), 'days', 1),
+)
+
+_DIGITS_RE = re.compile(r'(\d+)')
+_TOKEN_RE = re.compile(r'\w+')
+_SYMBOL_SET = frozenset(NEWS_SYMBOLS)
+
+
+def _build_automaton(groups):
+    """Build an Aho-Corasick automaton mapping each keyword to (rank, label, keyword)"""
+    automaton = ahocorasick.Automaton()
+    for rank, (label, words) in enumerate(groups):
+        for word in words:
+            if word not in automaton:
+                automaton.add_word(word, (rank, label, word))
+    automaton.make_automaton()
+    return automaton
+
+
+# One automaton per keyword family; each article is scanned once per family
+_CATEGORY_AC = _build_automaton(CATEGORY_KEYWORDS)
+_IMPACT_AC = _build_automaton(IMPACT_KEYWORDS)
+
+
+def _best_match(automaton, text):
+    """Return the label of the highest-priority keyword found in text, or None"""
+    best = None
+    for _, (rank, label, _) in automaton.iter(text):
+        if best is None or rank < best[0]:
+            best = (rank, label)
+            if rank == 0:
+                break
+    return best[1] if best else None
+
+
+@lru_cache(maxsize=4096)
+def _determine_category(content_lower: str, section: str) -> str:
+    """Determine article category from lower-cased content and the scraped section"""
+    # Section-based categorization
+    if section == 'crypto':
+        return 'crypto'
+    elif section == 'forex':
+        return 'forex'
+    elif section == 'economic-indicators':
+        return 'macro'
+    elif section == 'earnings-calendar':
+        return 'earnings'
+
+    # Content-based categorization
+    return _best_match(_CATEGORY_AC, content_lower) or 'business'
+
+
+@lru_cache(maxsize=4096)
+def _determine_impact_level(content_lower: str) -> str:
+    """Determine impact level from lower-cased title and summary"""
+    return _best_match(_IMPACT_AC, content_lower) or 'normal'
+
+
+def _is_news_container(elem) -> bool:
+    """True for article/div elements whose class looks like a news card"""
+    css_class = elem.get('class') or ''
+    return any(name in css_class for name in CONTAINER_CLASSES)
+
+
+def _text(elem) -> str:
+    """Stripped text content of an element (iterparse yields plain etree elements)"""
+    return ''.join(elem.itertext()).strip()
+
+
+def _first(xpath, node):
+    """Return the first match of xpath under node, else None"""
+    found = xpath(node)
+    return found[0] if found else None
+
+
+def _pick(candidates, classes, fallback):
+    """First candidate whose class mentions one of classes, else the first accepted by fallback"""
+    first = None
+    for elem in candidates:
+        css_class = elem.get('class') or ''
+        if any(name in css_class for name in classes):
+            return elem
+        if first is None and fallback(elem):
+            first = elem
+    return first
+
+
+@dataclass(slots=True)
+class Article:
+    """A scraped news article; converted to a dict only when building the response"""
+    id: str
+    title: str
+    summary: str
+    content: str
+    url: str
+    source: str
+    published_at: str
+    image_url: Optional[str]
+    symbols: List[str]
+    category: str
+    impact_level: str
+    is_breaking: bool
+    tags: List[str]
+
+
 class NewsService:
     """Service for fetching and managing financial news from Investing.com"""
 
+    # Shared across instances so keep-alive connections survive between requests
+    _session = None
+    _session_lock = threading.Lock()
+
+    # (symbol, category, limit) -> (result, json_bytes), shared by every instance
+    _news_cache = None
+    _news_cache_lock = threading.RLock()
+
+    # Worker pool for fetching several sections concurrently (created on first use)
+    _executor = None
+    _executor_lock = threading.Lock()
+
     def __init__(self):
         self.base_url = 'https://www.investing.com'
+        self.session = self._get_session()
         self.cache_ttl = current_app.config.get('NEWS_CACHE_TTL', 120)
 
-        # Simple in-memory cache (in production, use Redis)
-        self._cache = {}
-        self._cache_timestamps = {}
-
         # Investing.com news sections
         self.news_sections = {
             'business': '/news/stock-market-news',
@@ -30,27 +216,42 @@ class NewsService:
             'technology': '/news/technology-news'
         }
 
-    def _is_cache_valid(self, key: str) -> bool:
-        """Check if cached data is still valid"""
-        if key not in self._cache_timestamps:
-            return False
-
-        cache_time = self._cache_timestamps[key]
-        return (datetime.now() - cache_time).total_seconds() < self.cache_ttl
-
-    def _get_cached_data(self, key: str) -> Optional[Any]:
-        """Get data from cache if valid"""
-        if self._is_cache_valid(key):
-            return self._cache[key]
-        return None
-
-    def _set_cached_data(self, key: str, data: Any):
-        """Store data in cache with timestamp"""
-        self._cache[key] = data
-        self._cache_timestamps[key] = datetime.now()
-
-    def _scrape_investing_news(self, section: str = '', limit: int = 20) -> List[Dict]:
-        """Scrape news from Investing.com"""
+    @classmethod
+    def _get_session(cls) -> requests.Session:
+        """Return the pooled HTTP session, creating it on first use"""
+        if cls._session is None:
+            with cls._session_lock:
+                if cls._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=4,
+                        pool_maxsize=16,
+                        max_retries=Retry(total=2, backoff_factor=0.3)
+                    )
+                    session.mount('https://', adapter)
+                    session.headers.update(_INVESTING_HEADERS)
+                    cls._session = session
+        return cls._session
+
+    @classmethod
+    def _get_executor(cls) -> ThreadPoolExecutor:
+        """Return the shared section-scrape pool, creating it on first use"""
+        if cls._executor is None:
+            with cls._executor_lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='news-scrape')
+        return cls._executor
+
+    @classmethod
+    def _get_news_cache(cls, ttl: int) -> TTLCache:
+        """Return the shared payload cache, creating it on first use (call with the lock held)"""
+        if cls._news_cache is None:
+            cls._news_cache = TTLCache(maxsize=256, ttl=ttl)
+        return cls._news_cache
+
+    def _scrape_investing_news(self, section: str = '', limit: int = 20,
+                               symbol_upper: Optional[str] = None) -> List[Article]:
+        """Scrape news from Investing.com, keeping only articles that mention symbol_upper when given"""
         try:
             if section and section in self.news_sections:
                 url = f"{self.base_url}{self.news_sections[section]}"
@@ -59,99 +260,100 @@ class NewsService:
 
             logger.info(f"Scraping Investing.com news from: {url}")
 
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-            }
+            # Stream the body into the parser so cards are handled as they arrive
+            with self.session.get(url, timeout=15, stream=True) as response:
+                logger.info(f"Investing.com response status: {response.status_code}")
 
-            response = requests.get(url, headers=headers, timeout=15)
-            logger.info(f"Investing.com response status: {response.status_code}")
-            logger.info(f"Investing.com response content length: {len(response.content)}")
+                if response.status_code != 200:
+                    logger.error(f"Investing.com request failed: {response.status_code}")
+                    logger.error(f"Response text: {response.text[:500]}")
+                    return []
 
-            if response.status_code != 200:
-                logger.error(f"Investing.com request failed: {response.status_code}")
-                logger.error(f"Response text: {response.text[:500]}")
-                return []
+                response.raw.decode_content = True
+                context = etree.iterparse(response.raw, events=('end',), tag=CONTAINER_TAGS, html=True)
 
-            soup = BeautifulSoup(response.content, 'html.parser')
-            logger.info(f"Parsed HTML title: {soup.title.string if soup.title else 'No title'}")
-            logger.info(f"Found {len(soup.find_all('article'))} article tags")
-            logger.info(f"Found {len(soup.find_all('div', class_=re.compile(r'.*(article|news|story|item).*')))} potential article containers")
+                # Extract news articles
+                articles = []
+                cards = 0
 
-            # Extract news articles
-            articles = []
+                # Look for news articles in different possible containers
+                for _, container in context:
+                    if not _is_news_container(container):
+                        continue
 
-            # Look for news articles in different possible containers
-            article_containers = soup.find_all(['article', 'div'], class_=re.compile(r'.*(article|news|story|item).*'))
+                    try:
+                        # Extract title
+                        title_elem = _pick(TITLE_XP(container), ('title',), lambda elem: True)
+                        title = _text(title_elem) if title_elem is not None else ""
+
+                        if not title or len(title) < 10:
+                            continue
+
+                        # Extract link
+                        link = _first(LINK_XP, container) or ""
+                        if link and not link.startswith('http'):
+                            link = f"{self.base_url}{link}"
+
+                        # Extract summary/description
+                        summary_elem = _pick(SUMMARY_XP(container), ('summary', 'description', 'excerpt'),
+                                             lambda elem: bool((elem.text or '').strip()))
+                        summary = _text(summary_elem) if summary_elem is not None else ""
+
+                        # Extract image
+                        image_url = _first(IMG_XP, container)
+                        if image_url and not image_url.startswith('http'):
+                            image_url = f"https:{image_url}" if image_url.startswith('//') else f"{self.base_url}{image_url}"
+
+                        # Extract time
+                        time_elem = _pick(TIME_XP(container), ('time',), lambda elem: elem.get('datetime') is not None)
+                        published_at = self._parse_time(time_elem)
+
+                        cards += 1
+                        text = title + " " + summary
+
+                        # Symbols come from the same text, so one check covers title, summary and symbols
+                        if symbol_upper and symbol_upper not in text.upper():
+                            continue
+
+                        # Determine category and symbols
+                        lower = text.lower()
+                        category = _determine_category(lower, section)
+                        symbols = self._extract_symbols_from_content(text)
+
+                        # Determine impact level
+                        impact_level = _determine_impact_level(lower)
+
+                        article = Article(
+                            id=link.split('/')[-1] if link else f"investing_{len(articles)}",
+                            title=title,
+                            summary=summary[:300] + "..." if len(summary) > 300 else summary,
+                            content=summary,
+                            url=link,
+                            source='Investing.com',
+                            published_at=published_at,
+                            image_url=image_url,
+                            symbols=symbols,
+                            category=category,
+                            impact_level=impact_level,
+                            is_breaking=impact_level == 'high',
+                            tags=[category, impact_level] + symbols[:3]
+                        )
 
-            for container in article_containers[:limit]:
-                try:
-                    # Extract title
-                    title_elem = container.find(['h1', 'h2', 'h3', 'a'], class_=re.compile(r'.*title.*')) or \
-                                container.find(['h1', 'h2', 'h3', 'a'])
-                    title = title_elem.get_text(strip=True) if title_elem else ""
+                        articles.append(article)
+
+                        # Drop the parsed card so the tree does not keep growing
+                        container.clear(keep_tail=True)
 
-                    if not title or len(title) < 10:
+                    except Exception as e:
+                        logger.warning(f"Error parsing article: {e}")
                         continue
 
-                    # Extract link
-                    link_elem = container.find('a', href=True)
-                    link = link_elem['href'] if link_elem else ""
-                    if link and not link.startswith('http'):
-                        link = f"{self.base_url}{link}"
-
-                    # Extract summary/description
-                    summary_elem = container.find(['p', 'div'], class_=re.compile(r'.*(summary|description|excerpt).*')) or \
-                                 container.find(['p', 'div'], string=True)
-                    summary = summary_elem.get_text(strip=True) if summary_elem else ""
-
-                    # Extract image
-                    img_elem = container.find('img', src=True)
-                    image_url = img_elem['src'] if img_elem else None
-                    if image_url and not image_url.startswith('http'):
-                        image_url = f"https:{image_url}" if image_url.startswith('//') else f"{self.base_url}{image_url}"
-
-                    # Extract time
-                    time_elem = container.find(['time', 'span'], class_=re.compile(r'.*time.*')) or \
-                              container.find(['time', 'span'], datetime=True)
-                    published_at = self._parse_time(time_elem)
-
-                    # Determine category and symbols
-                    category = self._determine_category(title + " " + summary, section)
-                    symbols = self._extract_symbols_from_content(title + " " + summary)
-
-                    # Determine impact level
-                    impact_level = self._determine_impact_level(title, summary)
-
-                    article = {
-                        'id': link.split('/')[-1] if link else f"investing_{len(articles)}",
-                        'title': title,
-                        'summary': summary[:300] + "..." if len(summary) > 300 else summary,
-                        'content': summary,
-                        'url': link,
-                        'source': 'Investing.com',
-                        'published_at': published_at,
-                        'image_url': image_url,
-                        'symbols': symbols,
-                        'category': category,
-                        'impact_level': impact_level,
-                        'is_breaking': impact_level == 'high',
-                        'tags': [category, impact_level] + symbols[:3]
-                    }
-
-                    articles.append(article)
-
-                except Exception as e:
-                    logger.warning(f"Error parsing article: {e}")
-                    continue
+                    if len(articles) >= limit:
+                        break
 
-            # If we didn't find articles in the expected containers, try alternative parsing
-            if len(articles) == 0:
-                articles = self._fallback_parsing(soup, limit)
+                # If we didn't find articles in the expected containers, try alternative parsing
+                if cards == 0:
+                    articles = self._fallback_parsing(context.root, limit, symbol_upper)
 
             logger.info(f"Successfully scraped {len(articles)} articles from Investing.com")
             return articles
@@ -160,6 +362,26 @@ class NewsService:
             logger.error(f"Error scraping Investing.com: {e}")
             return []
 
+    def _scrape_all_sections(self, limit: int, symbol_upper: Optional[str] = None) -> List[Article]:
+        """Scrape the front page and every section concurrently, merged and de-duplicated by URL"""
+        executor = self._get_executor()
+        sections = [''] + list(self.news_sections)
+        futures = [executor.submit(self._scrape_investing_news, section, limit, symbol_upper) for section in sections]
+
+        # Collect in submission order so the merged list is stable between refreshes
+        merged = []
+        seen = set()
+        for future in futures:
+            for article in future.result():
+                key = article.url or article.id
+                if key in seen:
+                    continue
+                seen.add(key)
+                merged.append(article)
+                if len(merged) >= limit:
+                    return merged
+        return merged
+
     def get_financial_news(self, symbol: Optional[str] = None, category: Optional[str] = None,
                           limit: int = 50) -> Dict[str, Any]:
         """
@@ -174,45 +396,57 @@ class NewsService:
             Dict with normalized news articles
         """
 
-        # Create cache key based on parameters
-        cache_key = f"news_{symbol or 'all'}_{category or 'all'}_{limit}"
-
-        # Check cache first
-        cached_data = self._get_cached_data(cache_key)
-        if cached_data:
-            logger.info("Returning cached news data")
-            return cached_data
-
+        result, _ = self._lookup(symbol, category, limit)
+
+        # Callers add per-user keys to the response; keep them off the cached dict
+        return dict(result)
+
+    def get_financial_news_bytes(self, symbol: Optional[str] = None, category: Optional[str] = None,
+                                 limit: int = 50, extra: Optional[Dict[str, Any]] = None) -> bytes:
+        """Same payload as get_financial_news, pre-encoded as JSON for Response(..., mimetype='application/json')"""
+        _, payload = self._lookup(symbol, category, limit)
+        if not extra:
+            return payload
+
+        # Splice per-request keys into the cached object instead of re-encoding it
+        return payload[:-1] + b',' + orjson.dumps(extra)[1:]
+
+    def _lookup(self, symbol: Optional[str], category: Optional[str], limit: int):
+        """Return the cached (result, json_bytes) pair for these filters, scraping on a miss"""
+        key = (symbol or '', category or '', limit)
+        with self._news_cache_lock:
+            entry = self._get_news_cache(self.cache_ttl).get(key)
+        if entry is not None:
+            return entry
+
+        # Scrape outside the lock so one slow fetch does not block other filters
+        result = self._fetch_news(symbol or None, category or None, limit)
+        entry = (result, orjson.dumps(result))
+        with self._news_cache_lock:
+            self._news_cache[key] = entry
+        return entry
+
+    def _fetch_news(self, symbol: Optional[str], category: Optional[str], limit: int) -> Dict[str, Any]:
+        """Scrape, filter and normalize news for one set of filters (uncached)"""
         # Scrape news from Investing.com
         logger.info(f"Starting news scraping for category: {category}, limit: {limit}")
+        symbol_upper = symbol.upper() if symbol else None
         try:
-            articles = self._scrape_investing_news(category or '', limit)
+            if category:
+                articles = self._scrape_investing_news(category, limit, symbol_upper)
+            else:
+                articles = self._scrape_all_sections(limit, symbol_upper)
             logger.info(f"Scraping returned {len(articles)} articles")
         except Exception as e:
             logger.error(f"Exception during scraping: {e}")
             articles = []
 
         if not articles:
-            # Return fallback data if scraping fails
+            # Return fallback data if scraping fails (or nothing scraped mentions the symbol)
             logger.warning("Investing.com scraping failed, returning fallback data")
-            fallback_data = self._get_fallback_news()
-            self._set_cached_data(cache_key, fallback_data)
-            return fallback_data
-
-        # Filter by symbol if specified
-        if symbol:
-            # Filter articles that mention the symbol
-            symbol_upper = symbol.upper()
-            filtered_articles = [
-                article for article in articles
-                if symbol_upper in ' '.join(article.get('symbols', [])).upper() or
-                   symbol_upper in article.get('title', '').upper() or
-                   symbol_upper in article.get('summary', '').upper()
-            ]
-            articles = filtered_articles[:limit]
-
-        # Apply additional filtering and normalization
-        normalized_articles = self._post_process_articles(articles, symbol, category)
+            return self._get_fallback_news()
+
+        normalized_articles = [asdict(article) for article in articles]
 
         result = {
             'articles': normalized_articles,
@@ -224,185 +458,82 @@ class NewsService:
             'source': 'Investing.com'
         }
 
-        # Cache the result
-        self._set_cached_data(cache_key, result)
-
         return result
 
     def _parse_time(self, time_elem) -> str:
         """Parse time from Investing.com HTML elements"""
-        if not time_elem:
-            return datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')
+        now = datetime.now()
+        if time_elem is None:
+            return now.strftime('%Y-%m-%d %H:%M:%S UTC')
 
         # Try to get datetime attribute
         if hasattr(time_elem, 'get') and time_elem.get('datetime'):
             try:
-                dt = datetime.fromisoformat(time_elem['datetime'].replace('Z', '+00:00'))
+                dt = datetime.fromisoformat(time_elem.get('datetime').replace('Z', '+00:00'))
                 return dt.strftime('%Y-%m-%d %H:%M:%S UTC')
             except:
                 pass
 
         # Try to parse text content
-        text = time_elem.get_text(strip=True) if hasattr(time_elem, 'get_text') else str(time_elem)
-        text = text.lower()
-
-        # Handle relative time formats
-        if 'minute' in text or 'min' in text:
-            minutes = int(re.search(r'(\d+)', text).group(1)) if re.search(r'(\d+)', text) else 0
-            dt = datetime.now() - timedelta(minutes=minutes)
-        elif 'hour' in text or 'hr' in text:
-            hours = int(re.search(r'(\d+)', text).group(1)) if re.search(r'(\d+)', text) else 0
-            dt = datetime.now() - timedelta(hours=hours)
-        elif 'day' in text or 'yesterday' in text:
-            days = 1 if 'yesterday' in text else (int(re.search(r'(\d+)', text).group(1)) if re.search(r'(\d+)', text) else 1)
-            dt = datetime.now() - timedelta(days=days)
-        else:
-            dt = datetime.now()
+        text = (_text(time_elem) if hasattr(time_elem, 'itertext') else str(time_elem)).lower()
+
+        # Handle relative time formats ("5 min ago", "2 hours ago", "yesterday")
+        dt = now
+        for markers, unit, default in _RELATIVE_UNITS:
+            if any(marker in text for marker in markers):
+                if unit == 'days' and 'yesterday' in text:
+                    amount = 1
+                else:
+                    match = _DIGITS_RE.search(text)
+                    amount = int(match.group(1)) if match else default
+                dt = now - timedelta(**{unit: amount})
+                break
 
         return dt.strftime('%Y-%m-%d %H:%M:%S UTC')
 
-    def _determine_category(self, content: str, section: str) -> str:
-        """Determine article category based on content and section"""
-        content_lower = content.lower()
-
-        # Section-based categorization
-        if section == 'crypto':
-            return 'crypto'
-        elif section == 'forex':
-            return 'forex'
-        elif section == 'economic-indicators':
-            return 'macro'
-        elif section == 'earnings-calendar':
-            return 'earnings'
-
-        # Content-based categorization
-        if any(word in content_lower for word in ['crypto', 'bitcoin', 'ethereum', 'blockchain', 'nft']):
-            return 'crypto'
-        elif any(word in content_lower for word in ['forex', 'currency', 'dollar', 'euro', 'yen']):
-            return 'forex'
-        elif any(word in content_lower for word in ['fed', 'federal reserve', 'interest rate', 'inflation', 'economy']):
-            return 'macro'
-        elif any(word in content_lower for word in ['earnings', 'quarterly', 'results', 'revenue']):
-            return 'earnings'
-        elif any(word in content_lower for word in ['technology', 'tech', 'software', 'ai', 'artificial']):
-            return 'technology'
-        else:
-            return 'business'
-
     def _extract_symbols_from_content(self, content: str) -> List[str]:
         """Extract stock/crypto symbols from article content"""
         if not content:
             return []
 
-        # Common symbols to look for (expanded list)
-        symbols = [
-            'AAPL', 'TSLA', 'NVDA', 'GOOGL', 'MSFT', 'META', 'AMZN', 'NFLX',
-            'BTC', 'ETH', 'BNB', 'ADA', 'SOL', 'DOT', 'DOGE', 'SHIB', 'AVAX',
-            'USD', 'EUR', 'GBP', 'JPY', 'CHF', 'CAD', 'AUD',
-            'SPY', 'QQQ', 'IWM', 'VTI', 'VXUS', 'BND', 'VNQ',
-            'XOM', 'CVX', 'COP', 'EOG', 'PXD', 'MPC', 'PSX',
-            'JPM', 'BAC', 'WFC', 'C', 'GS', 'MS', 'DB',
-            'JNJ', 'PFE', 'MRK', 'ABBV', 'BMY', 'LLY',
-            'WMT', 'HD', 'COST', 'TGT', 'LOW',
-            'KO', 'PEP', 'MDLZ', 'MO', 'PM'
-        ]
+        # Whole-word tokens intersected with the symbol set (same as \bSYM\b matching)
+        found = _SYMBOL_SET.intersection(_TOKEN_RE.findall(content.upper()))
+        return [symbol for symbol in NEWS_SYMBOLS if symbol in found]
 
-        found_symbols = []
-        content_upper = content.upper()
-
-        for symbol in symbols:
-            # Look for symbol with word boundaries
-            if re.search(r'\b' + re.escape(symbol) + r'\b', content_upper):
-                found_symbols.append(symbol)
-
-        return found_symbols
-
-    def _determine_impact_level(self, title: str, summary: str) -> str:
-        """Determine impact level of news article"""
-        content = (title + " " + summary).lower()
-
-        # High impact keywords
-        high_impact = [
-            'breaking', 'alert', 'emergency', 'crash', 'surge', 'plunge',
-            'bankruptcy', 'collapse', 'crisis', 'recession', 'bear market',
-            'bull market', 'record high', 'record low', 'historic',
-            'federal reserve', 'interest rate decision', 'fomc',
-            'geopolitical', 'war', 'sanctions', 'trade war'
-        ]
-
-        # Medium impact keywords
-        medium_impact = [
-            'earnings', 'quarterly results', 'guidance', 'forecast',
-            'merger', 'acquisition', 'deal', 'partnership',
-            'lawsuit', 'regulation', 'sec', 'fda', 'approval',
-            'upgrade', 'downgrade', 'rating change'
-        ]
-
-        if any(word in content for word in high_impact):
-            return 'high'
-        elif any(word in content for word in medium_impact):
-            return 'medium'
-        else:
-            return 'normal'
-
-    def _post_process_articles(self, articles: List[Dict], symbol: Optional[str] = None,
-                             category: Optional[str] = None) -> List[Dict]:
-        """Post-process and normalize scraped articles"""
-        processed = []
-
-        for article in articles:
-            # Ensure all required fields are present
-            processed_article = {
-                'id': article.get('id', f"article_{len(processed)}"),
-                'title': article.get('title', 'Untitled'),
-                'summary': article.get('summary', ''),
-                'content': article.get('content', article.get('summary', '')),
-                'url': article.get('url', ''),
-                'source': article.get('source', 'Investing.com'),
-                'published_at': article.get('published_at', datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')),
-                'image_url': article.get('image_url'),
-                'symbols': article.get('symbols', []),
-                'category': article.get('category', 'business'),
-                'impact_level': article.get('impact_level', 'normal'),
-                'is_breaking': article.get('impact_level') == 'high',
-                'tags': article.get('tags', [])
-            }
-
-            processed.append(processed_article)
-
-        return processed
-
-    def _fallback_parsing(self, soup: BeautifulSoup, limit: int) -> List[Dict]:
+    def _fallback_parsing(self, tree: etree._Element, limit: int,
+                          symbol_upper: Optional[str] = None) -> List[Article]:
         """Fallback parsing method if main parsing fails"""
         articles = []
 
         try:
             # Look for any links that might be news articles
-            links = soup.find_all('a', href=re.compile(r'/news/'))
+            links = NEWS_LINK_XP(tree)
 
             for link in links[:limit]:
                 href = link.get('href')
                 if href and '/news/' in href:
-                    title = link.get_text(strip=True)
+                    title = _text(link)
+                    if symbol_upper and symbol_upper not in title.upper():
+                        continue
                     if title and len(title) > 20:  # Likely a real article title
                         if not href.startswith('http'):
                             href = f"{self.base_url}{href}"
 
-                        article = {
-                            'id': href.split('/')[-1] if href else f"fallback_{len(articles)}",
-                            'title': title,
-                            'summary': f"Read the full article about {title[:50]}...",
-                            'content': f"Read the full article about {title[:50]}...",
-                            'url': href,
-                            'source': 'Investing.com',
-                            'published_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC'),
-                            'image_url': None,
-                            'symbols': self._extract_symbols_from_content(title),
-                            'category': self._determine_category(title, ''),
-                            'impact_level': 'normal',
-                            'is_breaking': False,
-                            'tags': ['business', 'normal']
-                        }
+                        article = Article(
+                            id=href.split('/')[-1] if href else f"fallback_{len(articles)}",
+                            title=title,
+                            summary=f"Read the full article about {title[:50]}...",
+                            content=f"Read the full article about {title[:50]}...",
+                            url=href,
+                            source='Investing.com',
+                            published_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC'),
+                            image_url=None,
+                            symbols=self._extract_symbols_from_content(title),
+                            category=_determine_category(title.lower(), ''),
+                            impact_level='normal',
+                            is_breaking=False,
+                            tags=['business', 'normal']
+                        )
                         articles.append(article)
 
         except Exception as e:
@@ -410,104 +541,6 @@ class NewsService:
 
         return articles
 
-    def _normalize_articles(self, articles: List[Dict], symbol: Optional[str] = None) -> List[Dict]:
-        """Normalize NewsAPI articles to our format"""
-        normalized = []
-
-        for article in articles[:50]:  # Limit to 50 articles
-            try:
-                # Parse published date
-                published_at = article.get('publishedAt', '')
-                try:
-                    # Convert to datetime for consistent formatting
-                    dt = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
-                    formatted_date = dt.strftime('%Y-%m-%d %H:%M:%S UTC')
-                except:
-                    formatted_date = published_at
-
-                # Determine impact level (simplified logic)
-                title_lower = article.get('title', '').lower()
-                content_lower = article.get('description', '').lower()
-
-                impact_level = 'normal'
-                if any(word in title_lower for word in ['breaking', 'alert', 'emergency', 'crash', 'surge']):
-                    impact_level = 'high'
-                elif any(word in title_lower for word in ['earnings', 'results', 'quarterly', 'announcement']):
-                    impact_level = 'medium'
-
-                # Extract relevant symbols/assets from content
-                detected_symbols = self._extract_symbols_from_content(
-                    article.get('title', '') + ' ' + article.get('description', '')
-                )
-
-                # Determine category
-                category = self._categorize_article(article)
-
-                normalized_article = {
-                    'id': article.get('url', '').replace('/', '_').replace(':', '_'),  # Create ID from URL
-                    'title': article.get('title', ''),
-                    'summary': article.get('description', ''),
-                    'content': article.get('content', ''),
-                    'url': article.get('url', ''),
-                    'source': article.get('source', {}).get('name', 'Unknown'),
-                    'published_at': formatted_date,
-                    'image_url': article.get('urlToImage'),
-                    'symbols': detected_symbols,
-                    'category': category,
-                    'impact_level': impact_level,
-                    'is_breaking': impact_level == 'high',
-                    'tags': [category, impact_level] + (detected_symbols[:3] if detected_symbols else [])
-                }
-
-                normalized.append(normalized_article)
-
-            except Exception as e:
-                logger.warning(f"Error normalizing article: {e}")
-                continue
-
-        return normalized
-
-    def _extract_symbols_from_content(self, content: str) -> List[str]:
-        """Extract stock/crypto symbols from article content"""
-        if not content:
-            return []
-
-        # Common symbols to look for
-        symbols = [
-            'AAPL', 'TSLA', 'NVDA', 'GOOGL', 'MSFT', 'META', 'AMZN', 'NFLX',
-            'BTC', 'ETH', 'BNB', 'ADA', 'SOL', 'DOT', 'DOGE', 'SHIB',
-            'USD', 'EUR', 'GBP', 'JPY', 'CHF', 'CAD', 'AUD'
-        ]
-
-        found_symbols = []
-        content_upper = content.upper()
-
-        for symbol in symbols:
-            if f" {symbol} " in f" {content_upper} " or f"${symbol}" in content_upper:
-                found_symbols.append(symbol)
-
-        return found_symbols
-
-    def _categorize_article(self, article: Dict) -> str:
-        """Categorize article based on content"""
-        title = article.get('title', '').lower()
-        description = article.get('description', '').lower()
-
-        content = f"{title} {description}"
-
-        if any(word in content for word in ['crypto', 'bitcoin', 'ethereum', 'blockchain']):
-            return 'crypto'
-        elif any(word in content for word in ['forex', 'currency', 'dollar', 'euro', 'exchange']):
-            return 'forex'
-        elif any(word in content for word in ['earnings', 'quarterly', 'results', 'revenue']):
-            return 'earnings'
-        elif any(word in content for word in ['fed', 'federal reserve', 'interest rate', 'inflation']):
-            return 'macro'
-        elif any(word in content for word in ['technology', 'tech', 'software', 'ai', 'artificial']):
-            return 'technology'
-        else:
-            return 'business'
-
     def _get_fallback_news(self) -> Dict[str, Any]:
         """Return fallback news data when API is unavailable"""
         fallback_articles = [
@@ -1,105 +1,141 @@
-import uuid
+import secrets
+import threading
+import time
+from functools import partialmethod
+from concurrent.futures import ThreadPoolExecutor
+import orjson
 import requests
-from datetime import datetime
+from sqlalchemy import update
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from datetime import datetime, timezone
+from flask import current_app
 from extensions import db
 from models import Payment, PayPalConfig, Challenge
 from config import Config
+from services.challenge_engine import ChallengeEngine
 
-class PaymentService:
-    """Payment processing service"""
-    
-    def process_cmi_payment(self, user_id, challenge_id):
-        """Process CMI payment (mock with simulation)"""
-        import time
-        challenge = Challenge.query.get(challenge_id)
-        if not challenge:
-            raise ValueError("Challenge not found")
-
-        # Simulate payment processing delay (2-3 seconds)
-        time.sleep(2.5)
+# (connect, read) seconds for PayPal calls: fail fast when the API is unreachable
+PAYPAL_TIMEOUT = (3.05, 10)
+PAYPAL_RETRIES = 2
+# Longest one PayPal call can take: every attempt hitting both timeouts, plus retry backoff
+PAYPAL_CALL_BUDGET = sum(PAYPAL_TIMEOUT) * (PAYPAL_RETRIES + 1) + 2
 
-        # Generate mock transaction ID
-        transaction_id = f"CMI_{uuid.uuid4().hex[:16].upper()}"
+PAYPAL_BASE_URLS = {
+    'sandbox': 'https://api-m.sandbox.paypal.com',
+    'live': 'https://api-m.paypal.com',
+}
 
-        payment = Payment(
-            user_id=user_id,
-            challenge_id=challenge_id,
-            amount_mad=challenge.price_mad,
-            payment_method='cmi',
-            status='completed',
-            transaction_id=transaction_id,
-            completed_at=datetime.utcnow()
-        )
+def paypal_base_url(mode):
+    """PayPal REST root for a mode; anything but 'sandbox' is live"""
+    return PAYPAL_BASE_URLS['sandbox'] if mode == 'sandbox' else PAYPAL_BASE_URLS['live']
 
-        db.session.add(payment)
-        db.session.commit()
+# Mock gateways: key -> (transaction id prefix, stored payment_method)
+MOCK_PAYMENT_METHODS = {
+    'cmi': ('CMI', 'cmi'),
+    'crypto': ('CRYPTO', 'crypto'),
+    'paypal_mock': ('PAYPAL_MOCK', 'paypal'),
+}
 
-        return payment
+class PaymentService:
+    """Payment processing service"""
+    
+    # PayPal OAuth tokens keyed by (client_id, base_url) -> {'token': str, 'expires_at': epoch}
+    _paypal_token_cache = {}
+    _paypal_token_lock = threading.Lock()
+    _paypal_token_margin = 60  # refresh this many seconds before PayPal expires the token
+    
+    # Pooled HTTP session shared by every instance so PayPal connections are kept alive
+    _session = None
+    _session_lock = threading.Lock()
+    
+    # Background pool for PayPal HTTP calls that can overlap with DB work
+    _executor = None
+    
+    # Naive UTC to match the DateTime columns (utcnow() is deprecated as of 3.12)
+    _now = staticmethod(lambda: datetime.now(timezone.utc).replace(tzinfo=None))
+    
+    def __init__(self):
+        # Environment credentials are fixed for the process; resolve them once per service
+        self._paypal_client_id = Config.PAYPAL_CLIENT_ID
+        self._paypal_client_secret = Config.PAYPAL_CLIENT_SECRET
+        self._paypal_base = paypal_base_url(Config.PAYPAL_MODE)
+    
+    @classmethod
+    def _get_executor(cls):
+        """Return the shared PayPal worker pool, creating it on first use"""
+        if cls._executor is None:
+            with cls._session_lock:
+                if cls._executor is None:
+                    cls._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='paypal')
+        return cls._executor
+    
+    @classmethod
+    def _get_session(cls):
+        """Return the pooled PayPal session, creating it on first use"""
+        if cls._session is None:
+            with cls._session_lock:
+                if cls._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(
+                        pool_connections=4,
+                        pool_maxsize=16,
+                        max_retries=Retry(total=PAYPAL_RETRIES, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504])
+                    )
+                    session.mount('https://', adapter)
+                    # PayPal REST calls are JSON both ways; per-call headers only add Authorization
+                    session.headers.update({'Content-Type': 'application/json', 'Accept': 'application/json'})
+                    cls._session = session
+        return cls._session
+    
+    def _simulate_delay(self):
+        """Sleep for the configured mock gateway delay without holding the worker by default"""
+        delay = current_app.config.get('MOCK_PAYMENT_DELAY_SECONDS', 0)
+        if delay:
+            time.sleep(delay)
     
-    def process_crypto_payment(self, user_id, challenge_id):
-        """Process Crypto payment (mock with simulation)"""
-        import time
-        challenge = Challenge.query.get(challenge_id)
+    def _process_mock_payment(self, user_id, challenge_id, gateway):
+        """Record a completed payment through one of the mock gateways"""
+        prefix, method = MOCK_PAYMENT_METHODS[gateway]
+
+        challenge = db.session.get(Challenge, challenge_id)
         if not challenge:
             raise ValueError("Challenge not found")
 
-        # Simulate payment processing delay (3-4 seconds for crypto)
-        time.sleep(3.5)
-
-        # Generate mock transaction ID
-        transaction_id = f"CRYPTO_{uuid.uuid4().hex[:16].upper()}"
+        # Simulate payment processing delay (MOCK_PAYMENT_DELAY_SECONDS, 0 = none)
+        self._simulate_delay()
+        now = self._now()
 
         payment = Payment(
             user_id=user_id,
             challenge_id=challenge_id,
             amount_mad=challenge.price_mad,
-            payment_method='crypto',
+            payment_method=method,
             status='completed',
-            transaction_id=transaction_id,
-            completed_at=datetime.utcnow()
+            transaction_id=f"{prefix}_{secrets.token_hex(8).upper()}",
+            completed_at=now
         )
 
+        # Flush for payment.id; the caller owns the commit
         db.session.add(payment)
-        db.session.commit()
+        db.session.flush()
 
         return payment
+    
+    # Process CMI / Crypto payment (mock with simulation)
+    process_cmi_payment = partialmethod(_process_mock_payment, gateway='cmi')
+    process_crypto_payment = partialmethod(_process_mock_payment, gateway='crypto')
 
     def _mock_paypal_payment(self, user_id, challenge_id):
         """Mock PayPal payment for testing when credentials aren't configured"""
-        import time
-        from models import Challenge, UserChallenge
-        from services.challenge_engine import ChallengeEngine
-        import uuid
-
-        challenge = Challenge.query.get(challenge_id)
-        if not challenge:
-            raise ValueError("Challenge not found")
-
-        # Simulate payment processing delay (1.5-2.5 seconds for PayPal)
-        time.sleep(2.0)
-
-        # Generate mock transaction ID
-        transaction_id = f"PAYPAL_MOCK_{uuid.uuid4().hex[:16].upper()}"
-
-        payment = Payment(
-            user_id=user_id,
-            challenge_id=challenge_id,
-            amount_mad=challenge.price_mad,
-            payment_method='paypal',
-            status='completed',
-            transaction_id=transaction_id,
-            completed_at=datetime.utcnow()
-        )
-
-        db.session.add(payment)
-        db.session.commit()
+        payment = self._process_mock_payment(user_id, challenge_id, gateway='paypal_mock')
 
-        # Create user challenge with status 'active'
+        # Create user challenge with status 'active' in the same transaction as the payment
         challenge_engine = ChallengeEngine()
-        user_challenge = challenge_engine.create_user_challenge(user_id, challenge_id)
+        challenge_engine.create_user_challenge(user_id, challenge_id, commit=False)
 
         return {
-            'order_id': f'mock_order_{uuid.uuid4().hex[:8]}',
+            'order_id': f'mock_order_{secrets.token_hex(4)}',
             'approval_url': None,  # Mock - no redirect needed
             'payment_id': payment.id,
             'mock_payment': True,
@@ -108,82 +144,109 @@ class PaymentService:
 
     def create_paypal_order(self, user_id, challenge_id):
         """Create PayPal order"""
-        challenge = Challenge.query.get(challenge_id)
-        if not challenge:
-            raise ValueError("Challenge not found")
-
-        # Get PayPal config from environment
-        from config import Config
-        config = Config()
-        client_id = config.PAYPAL_CLIENT_ID
-        client_secret = config.PAYPAL_CLIENT_SECRET
-        mode = config.PAYPAL_MODE
-
-        if not client_id or not client_secret:
+        if not self._paypal_client_id or not self._paypal_client_secret:
             # Fallback to mock payment for testing
             return self._mock_paypal_payment(user_id, challenge_id)
 
-        # PayPal API endpoint
-        base_url = 'https://api-m.sandbox.paypal.com' if mode == 'sandbox' else 'https://api-m.paypal.com'
+        # Fetch the access token while the challenge row loads
+        token_future = self._get_executor().submit(
+            self._get_paypal_access_token_env, self._paypal_client_id, self._paypal_client_secret, self._paypal_base
+        )
 
-        # Get access token
-        access_token = self._get_paypal_access_token_env(client_id, client_secret, base_url)
+        challenge = db.session.get(Challenge, challenge_id)
+        if not challenge:
+            raise ValueError("Challenge not found")
+
+        access_token = token_future.result(timeout=PAYPAL_CALL_BUDGET)
         if not access_token:
             raise ValueError("Failed to get PayPal access token")
         
-        # Create order
+        order = self._post_paypal_order(self._paypal_base, access_token, challenge.price_mad)
+        
+        # Create payment record
+        payment = self._pending_paypal_payment(user_id, challenge, order)
+        db.session.add(payment)
+        db.session.flush()
+        
+        return self._paypal_order_result(order, payment)
+    
+    def create_paypal_orders_bulk(self, pairs):
+        """Create PayPal orders for (user_id, challenge_id) pairs, posting them concurrently"""
+        if not self._paypal_client_id or not self._paypal_client_secret:
+            return [self._mock_paypal_payment(user_id, challenge_id) for user_id, challenge_id in pairs]
+
+        access_token = self._get_paypal_access_token_env(
+            self._paypal_client_id, self._paypal_client_secret, self._paypal_base
+        )
+        if not access_token:
+            raise ValueError("Failed to get PayPal access token")
+
+        challenge_ids = {challenge_id for _, challenge_id in pairs}
+        challenges = {c.id: c for c in Challenge.query.filter(Challenge.id.in_(challenge_ids)).all()}
+        if len(challenges) != len(challenge_ids):
+            raise ValueError("Challenge not found")
+
+        # HTTP calls fan out on the pool; DB writes stay on this thread's session
+        executor = self._get_executor()
+        futures = [
+            executor.submit(self._post_paypal_order, self._paypal_base, access_token, challenges[challenge_id].price_mad)
+            for _, challenge_id in pairs
+        ]
+
+        created = []
+        for (user_id, challenge_id), future in zip(pairs, futures):
+            order = future.result()
+            payment = self._pending_paypal_payment(user_id, challenges[challenge_id], order)
+            db.session.add(payment)
+            created.append((order, payment))
+        db.session.flush()
+
+        return [self._paypal_order_result(order, payment) for order, payment in created]
+    
+    def _post_paypal_order(self, base_url, access_token, amount_mad):
+        """POST a capture-intent order to PayPal and return the order JSON"""
         order_data = {
             "intent": "CAPTURE",
             "purchase_units": [{
                 "amount": {
                     "currency_code": "MAD",
-                    "value": str(float(challenge.price_mad))
+                    "value": str(float(amount_mad))
                 }
             }]
         }
         
-        headers = {
-            'Content-Type': 'application/json',
-            'Authorization': f'Bearer {access_token}'
-        }
-        
-        response = requests.post(
+        response = self._get_session().post(
             f'{base_url}/v2/checkout/orders',
-            json=order_data,
-            headers=headers,
-            timeout=10
+            data=orjson.dumps(order_data),
+            headers={'Authorization': f'Bearer {access_token}'},
+            timeout=PAYPAL_TIMEOUT
         )
         
-        if response.status_code == 201:
-            order = response.json()
-            
-            # Create payment record
-            payment = Payment(
-                user_id=user_id,
-                challenge_id=challenge_id,
-                amount_mad=challenge.price_mad,
-                payment_method='paypal',
-                status='pending',
-                paypal_order_id=order['id']
-            )
-            
-            db.session.add(payment)
-            db.session.commit()
-            
-            # Find approval link
-            approval_url = None
-            for link in order.get('links', []):
-                if link.get('rel') == 'approve':
-                    approval_url = link.get('href')
-                    break
-            
-            return {
-                'order_id': order['id'],
-                'approval_url': approval_url,
-                'payment_id': payment.id
-            }
-        else:
+        if response.status_code != 201:
             raise ValueError(f"PayPal API error: {response.text}")
+        return orjson.loads(response.content)
+    
+    def _pending_paypal_payment(self, user_id, challenge, order):
+        """Build the pending Payment row for a created PayPal order"""
+        return Payment(
+            user_id=user_id,
+            challenge_id=challenge.id,
+            amount_mad=challenge.price_mad,
+            payment_method='paypal',
+            status='pending',
+            paypal_order_id=order['id']
+        )
+    
+    def _paypal_order_result(self, order, payment):
+        """Response payload for a created PayPal order"""
+        # Index HATEOAS links by rel; 'approve' is where the buyer is redirected
+        links_by_rel = {link.get('rel'): link.get('href') for link in order.get('links', ())}
+        
+        return {
+            'order_id': order['id'],
+            'approval_url': links_by_rel.get('approve'),
+            'payment_id': payment.id
+        }
     
     def capture_paypal_order(self, order_id):
         """Capture PayPal order"""
@@ -191,52 +254,71 @@ class PaymentService:
         if not paypal_config:
             raise ValueError("PayPal not configured")
         
-        base_url = 'https://api-m.sandbox.paypal.com' if paypal_config.mode == 'sandbox' else 'https://api-m.paypal.com'
+        base_url = paypal_base_url(paypal_config.mode)
         access_token = self._get_paypal_access_token(paypal_config)
         
-        headers = {
-            'Content-Type': 'application/json',
-            'Authorization': f'Bearer {access_token}'
-        }
-        
-        response = requests.post(
+        response = self._get_session().post(
             f'{base_url}/v2/checkout/orders/{order_id}/capture',
-            headers=headers,
-            timeout=10
+            headers={'Authorization': f'Bearer {access_token}'},
+            timeout=PAYPAL_TIMEOUT
         )
         
         if response.status_code == 201:
-            capture_data = response.json()
+            capture_data = orjson.loads(response.content)
             
-            # Update payment status
-            payment = Payment.query.filter_by(paypal_order_id=order_id).first()
-            if payment:
-                payment.status = 'completed'
-                payment.transaction_id = capture_data.get('id')
-                payment.completed_at = datetime.utcnow()
-                db.session.commit()
+            # Update payment status in one indexed UPDATE instead of load + assign;
+            # the default session sync refreshes a Payment the caller already loaded
+            db.session.execute(
+                update(Payment)
+                .where(Payment.paypal_order_id == order_id)
+                .values(status='completed',
+                        transaction_id=capture_data.get('id'),
+                        completed_at=self._now())
+            )
             
             return capture_data
         else:
             raise ValueError(f"PayPal capture error: {response.text}")
     
     def _get_paypal_access_token_env(self, client_id, client_secret, base_url):
-        """Get PayPal access token using environment credentials"""
-        auth = (client_id, client_secret)
-        headers = {'Accept': 'application/json', 'Accept-Language': 'en_US'}
-        data = {'grant_type': 'client_credentials'}
-
-        response = requests.post(
-            f'{base_url}/v1/oauth2/token',
-            auth=auth,
-            headers=headers,
-            data=data,
-            timeout=10
-        )
+        """Get PayPal access token using environment credentials (cached until shortly before expiry)"""
+        key = (client_id, base_url)
+        cached = self._paypal_token_cache.get(key)
+        if cached and time.time() < cached['expires_at']:
+            return cached['token']
 
-        if response.status_code == 200:
-            return response.json().get('access_token')
-        return None
+        # One thread refreshes; the others wait and reuse its token
+        with self._paypal_token_lock:
+            cached = self._paypal_token_cache.get(key)
+            if cached and time.time() < cached['expires_at']:
+                return cached['token']
+
+            auth = (client_id, client_secret)
+            # Token endpoint takes a form body, so override the session's JSON Content-Type
+            headers = {'Content-Type': 'application/x-www-form-urlencoded', 'Accept-Language': 'en_US'}
+            data = {'grant_type': 'client_credentials'}
+
+            response = self._get_session().post(
+                f'{base_url}/v1/oauth2/token',
+                auth=auth,
+                headers=headers,
+                data=data,
+                timeout=PAYPAL_TIMEOUT
+            )
+
+            if response.status_code != 200:
+                return None
+
+            body = orjson.loads(response.content)
+            token = body.get('access_token')
+            if not token:
+                return None
+
+            ttl = int(body.get('expires_in', 0)) - self._paypal_token_margin
+            if ttl > 0:
+                entry = {'token': token, 'expires_at': time.time() + ttl}
+                PaymentService._paypal_token_cache[key] = entry
+            return token
 
     def _get_paypal_access_token(self, paypal_config):
         """Legacy method for database config (deprecated)"""
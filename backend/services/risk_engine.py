@@ -1,42 +1,71 @@
+from datetime import datetime
+import numpy as np
+from sqlalchemy import case, or_, update
+from extensions import db
 from models import UserChallenge
 
+
+# (status, reason) for each risk rule, in the order the rules are checked
+_RULE_OUTCOMES = (
+    ('passed', 'Profit target achieved'),
+    ('failed', 'Daily loss limit exceeded'),
+    ('failed', 'Maximum drawdown exceeded'),
+    ('failed', 'Account equity depleted'),
+)
+
+
+def _triggered_rule(equity, initial_balance, profit_target, daily_loss, daily_loss_limit,
+                    peak_balance, max_drawdown_limit):
+    """Index into _RULE_OUTCOMES of the first rule hit, or None while the challenge stays active"""
+    if equity - initial_balance >= profit_target:
+        return 0
+    if daily_loss >= daily_loss_limit:
+        return 1
+    if peak_balance - equity >= max_drawdown_limit:
+        return 2
+    if equity <= 0:
+        return 3
+    return None
+
+
 class RiskEngine:
     """Risk management and evaluation engine"""
     
     def evaluate_challenge(self, user_challenge):
         """Evaluate challenge against all risk rules"""
-        evaluation = {
-            'status': 'active',
-            'reason': None
-        }
+        uc = user_challenge
+        rule = _triggered_rule(
+            uc.equity, uc.initial_balance, uc.profit_target,
+            uc.daily_loss, uc.daily_loss_limit,
+            uc.peak_balance, uc.max_drawdown_limit
+        )
         
-        # Check profit target
-        profit = user_challenge.equity - user_challenge.initial_balance
-        if profit >= user_challenge.profit_target:
-            evaluation['status'] = 'passed'
-            evaluation['reason'] = 'Profit target achieved'
-            return evaluation
-        
-        # Check daily loss limit
-        if user_challenge.daily_loss >= user_challenge.daily_loss_limit:
-            evaluation['status'] = 'failed'
-            evaluation['reason'] = 'Daily loss limit exceeded'
-            return evaluation
-        
-        # Check max drawdown
-        drawdown = user_challenge.peak_balance - user_challenge.equity
-        if drawdown >= user_challenge.max_drawdown_limit:
-            evaluation['status'] = 'failed'
-            evaluation['reason'] = 'Maximum drawdown exceeded'
-            return evaluation
-        
-        # Check if equity is negative or zero
-        if user_challenge.equity <= 0:
-            evaluation['status'] = 'failed'
-            evaluation['reason'] = 'Account equity depleted'
-            return evaluation
-        
-        return evaluation
+        if rule is None:
+            return {'status': 'active', 'reason': None}
+        
+        status, reason = _RULE_OUTCOMES[rule]
+        return {'status': status, 'reason': reason}
+    
+    def evaluate_challenges_bulk(self):
+        """Evaluate every active challenge from plain column tuples; returns [(id, status, reason)] for those that end"""
+        rows = UserChallenge.query.with_entities(
+            UserChallenge.id,
+            UserChallenge.equity,
+            UserChallenge.initial_balance,
+            UserChallenge.profit_target,
+            UserChallenge.daily_loss,
+            UserChallenge.daily_loss_limit,
+            UserChallenge.peak_balance,
+            UserChallenge.max_drawdown_limit
+        ).filter(UserChallenge.status == 'active').all()
+        
+        results = []
+        for challenge_id, *values in rows:
+            rule = _triggered_rule(*values)
+            if rule is not None:
+                status, reason = _RULE_OUTCOMES[rule]
+                results.append((challenge_id, status, reason))
+        return results
     
     def calculate_risk_metrics(self, user_challenge):
         """Calculate risk metrics for a challenge"""
@@ -57,3 +86,64 @@ class RiskEngine:
             'daily_loss_percent': float(daily_loss_percent),
             'remaining_daily_loss': float(user_challenge.daily_loss_limit - user_challenge.daily_loss),
         }
+    
+    def evaluate_all_active(self, commit=True):
+        """Pass/fail every active challenge that hits a risk rule with one UPDATE; returns rows changed"""
+        # Same rules and precedence as _triggered_rule, evaluated by the database
+        rules = (
+            (UserChallenge.equity - UserChallenge.initial_balance >= UserChallenge.profit_target, 'passed'),
+            (UserChallenge.daily_loss >= UserChallenge.daily_loss_limit, 'failed'),
+            (UserChallenge.peak_balance - UserChallenge.equity >= UserChallenge.max_drawdown_limit, 'failed'),
+            (UserChallenge.equity <= 0, 'failed'),
+        )
+        
+        stmt = (
+            update(UserChallenge)
+            .where(UserChallenge.status == 'active', or_(*(condition for condition, _ in rules)))
+            .values(status=case(*rules), completed_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        result = db.session.execute(stmt)
+        
+        if commit:
+            db.session.commit()
+        return result.rowcount
+    
+    def load_active_risk_rows(self):
+        """Return (ids, rows) for active challenges; rows is an (N, 5) float64 array of
+        [equity, initial_balance, peak_balance, daily_loss, daily_loss_limit]"""
+        records = UserChallenge.query.with_entities(
+            UserChallenge.id,
+            UserChallenge.equity,
+            UserChallenge.initial_balance,
+            UserChallenge.peak_balance,
+            UserChallenge.daily_loss,
+            UserChallenge.daily_loss_limit
+        ).filter(UserChallenge.status == 'active').all()
+        
+        ids = np.fromiter((r[0] for r in records), dtype=np.int64, count=len(records))
+        rows = np.array([r[1:] for r in records], dtype=np.float64).reshape(len(records), 5)
+        return ids, rows
+    
+    def calculate_risk_metrics_bulk(self, rows):
+        """Vectorized calculate_risk_metrics over rows from load_active_risk_rows; returns a dict of arrays"""
+        rows = np.asarray(rows, dtype=np.float64)
+        equity, initial, peak, daily_loss, daily_loss_limit = rows.T
+        
+        profit = equity - initial
+        drawdown = peak - equity
+        # Divide only where the denominator is positive; the rest stay 0 like the scalar version
+        profit_percent = np.divide(profit * 100, initial, out=np.zeros_like(profit), where=initial > 0)
+        drawdown_percent = np.divide(drawdown * 100, peak, out=np.zeros_like(drawdown), where=peak > 0)
+        daily_loss_percent = np.divide(daily_loss * 100, daily_loss_limit,
+                                       out=np.zeros_like(daily_loss), where=daily_loss_limit > 0)
+        
+        return {
+            'profit': profit,
+            'profit_percent': profit_percent,
+            'drawdown': drawdown,
+            'drawdown_percent': drawdown_percent,
+            'daily_loss': daily_loss,
+            'daily_loss_percent': daily_loss_percent,
+            'remaining_daily_loss': daily_loss_limit - daily_loss,
+        }
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""Test ChallengeEngine bulk creation"""
+
+from flask import Flask
+
+from extensions import db
+from models import Challenge, User
+from services.challenge_engine import ChallengeEngine
+
+app = Flask(__name__)
+app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+app.config['SECRET_KEY'] = 'test'
+db.init_app(app)
+
+def test_create_user_challenges_bulk_returns_ids():
+    """Every returned user challenge is persisted and carries its primary key"""
+    with app.app_context():
+        db.create_all()
+        try:
+            challenge = Challenge(name='Starter Challenge', tier='starter', initial_balance=5000.0, price_mad=200.0)
+            users = [
+                User(email=f'bulk{i}@example.com', password_hash='x', first_name='Bulk', last_name=str(i))
+                for i in range(3)
+            ]
+            db.session.add(challenge)
+            db.session.add_all(users)
+            db.session.commit()
+
+            user_challenges = ChallengeEngine().create_user_challenges_bulk([u.id for u in users], challenge.id)
+
+            ids = [uc.id for uc in user_challenges]
+            assert len(ids) == 3 and all(ids), ids
+            assert len(set(ids)) == 3
+            assert [uc.user_id for uc in user_challenges] == [u.id for u in users]
+            assert all(uc.to_dict()['id'] for uc in user_challenges)
+        finally:
+            db.session.remove()
+            db.drop_all()
+
+if __name__ == '__main__':
+    test_create_user_challenges_bulk_returns_ids()
+    print('[SUCCESS] ChallengeEngine bulk creation test passed')
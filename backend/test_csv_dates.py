@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Test date validation in the CSV validator"""
+
+import os
+import tempfile
+
+import numpy as np
+
+from utils.csv_validator import CSVValidator, is_iso_date, iso_date_mask
+
+HEADER = 'date,open,high,low,close,volume\n'
+
+def _validate_rows(*dates):
+    """Validate a temporary OHLC CSV with one well-formed price row per date"""
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            f.write(HEADER)
+            for date_str in dates:
+                f.write(f'{date_str},10.0,11.0,9.0,10.5,1000\n')
+        return CSVValidator().validate_csv_file(path)
+    finally:
+        os.remove(path)
+
+def test_is_iso_date_calendar():
+    """The ISO shape alone is not enough; the day must exist in that month"""
+    assert is_iso_date('2024-02-29')
+    assert is_iso_date('2024-01-31T09:30:00')
+    assert not is_iso_date('2023-02-29')  # Not a leap year
+    assert not is_iso_date('2024-02-30')
+    assert not is_iso_date('2024-04-31')
+    assert not is_iso_date('2024-06-31T00:00:00')
+
+def test_validator_rejects_impossible_days():
+    """Impossible days are reported like any other bad date"""
+    assert _validate_rows('2024-02-29', '2024-03-01') == (True, [])
+    for bad in ('2023-02-29', '2024-02-30', '2024-04-31', '2024-09-31', '2024-11-31'):
+        is_valid, errors = _validate_rows('2024-03-01', bad)
+        assert not is_valid, bad
+        assert errors == [f"Row 3: Invalid date format '{bad}T00:00:00'"], errors
+
+def test_iso_date_mask_matches_is_iso_date():
+    """The column check accepts exactly what the row check accepts"""
+    samples = [
+        '2024-02-29', '2024-01-31T09:30:00', '2023-02-29', '2024-02-30', '2024-04-31',
+        '2024', '2024-01', 'now', 'today', '', '2024-01-31T24:00:00', '2024-01-31T09:30:00Z',
+        '2024-01-31T09:30:00+01:00', '0000-01-01', '2024-13-01', '2024-1-01', '20240131',
+    ]
+    mask = iso_date_mask(np.array(samples))
+    assert mask.tolist() == [is_iso_date(s) for s in samples]
+
+def test_validator_rejects_loose_dates():
+    """Dates numpy would parse but the row path rejects make the file invalid"""
+    for bad in ('2024', 'now'):
+        is_valid, errors = _validate_rows('2024-03-01', bad)
+        assert not is_valid, bad
+        assert len(errors) == 1 and errors[0].startswith('Row 3: Invalid date format'), errors
+
+if __name__ == '__main__':
+    test_is_iso_date_calendar()
+    test_validator_rejects_impossible_days()
+    test_iso_date_mask_matches_is_iso_date()
+    test_validator_rejects_loose_dates()
+    print('[SUCCESS] CSV date validation tests passed')
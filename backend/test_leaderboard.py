@@ -3,12 +3,18 @@
 
 import requests
 import json
+from requests.adapters import HTTPAdapter
+
+BASE_URL = 'http://localhost:5000/api/leaderboard'
 
 def test_leaderboard_api():
     """Test the monthly leaderboard endpoint"""
+    # One keep-alive session so /stats reuses the /monthly connection
+    session = requests.Session()
+    session.mount('http://', HTTPAdapter(pool_maxsize=4))
     try:
         print("[TEST] Testing leaderboard API...")
-        response = requests.get('http://localhost:5000/api/leaderboard/monthly')
+        response = session.get(f'{BASE_URL}/monthly')
 
         if response.status_code == 200:
             data = response.json()
@@ -33,7 +39,7 @@ def test_leaderboard_api():
                 print(f"\n[PERIOD] {period.get('month', 'Unknown')}")
 
                 # Show stats
-                stats_response = requests.get('http://localhost:5000/api/leaderboard/stats')
+                stats_response = session.get(f'{BASE_URL}/stats')
                 if stats_response.status_code == 200:
                     stats_data = stats_response.json()
                     if stats_data.get('success'):
@@ -58,6 +64,8 @@ def test_leaderboard_api():
         print(f"[ERROR] Unexpected error: {e}")
         import traceback
         traceback.print_exc()
+    finally:
+        session.close()
 
 if __name__ == '__main__':
     test_leaderboard_api()
\ No newline at end of file
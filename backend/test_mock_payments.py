@@ -2,7 +2,9 @@
 """
 Test script for Mock Payment Gateway
 """
+import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from services.payment_service import PaymentService
 from services.challenge_engine import ChallengeEngine
 from extensions import db
@@ -12,9 +14,40 @@ from flask import Flask
 app = Flask(__name__)
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///tradesense.db'
 app.config['SECRET_KEY'] = 'test'
+app.config['MOCK_PAYMENT_DELAY_SECONDS'] = 0
 db.init_app(app)
 
-def test_mock_payments():
+def _run_cmi(user_id, challenge_id):
+    payment = PaymentService().process_cmi_payment(user_id, challenge_id)
+    return [f'   [PAYMENT] Payment ID: {payment.id}, Status: {payment.status}',
+            f'   [TXN] Transaction ID: {payment.transaction_id}']
+
+def _run_crypto(user_id, challenge_id):
+    payment = PaymentService().process_crypto_payment(user_id, challenge_id)
+    return [f'   [PAYMENT] Payment ID: {payment.id}, Status: {payment.status}',
+            f'   [TXN] Transaction ID: {payment.transaction_id}']
+
+def _run_paypal(user_id, challenge_id):
+    result = PaymentService()._mock_paypal_payment(user_id, challenge_id)
+    return [f'   [PAYMENT] Payment ID: {result["payment_id"]}, Mock: {result["mock_payment"]}',
+            f'   [ORDER] Order ID: {result["order_id"]}']
+
+PAYMENT_PROBES = [
+    ('1. Testing CMI Payment...', _run_cmi),
+    ('2. Testing Crypto Payment...', _run_crypto),
+    ('3. Testing PayPal Payment...', _run_paypal),
+]
+
+def _timed_probe(probe, user_id, challenge_id):
+    """Run one payment probe in its own app context (and so its own scoped DB session)"""
+    with app.app_context():
+        start_time = time.time()
+        lines = probe(user_id, challenge_id)
+        # Services only flush; outside a request the caller commits
+        db.session.commit()
+        return time.time() - start_time, lines
+
+def test_mock_payments(parallel=True):
     with app.app_context():
         # Get test user
         user = User.query.filter_by(email='test@example.com').first()
@@ -26,36 +59,20 @@ def test_mock_payments():
         print(f'Challenge: {challenge.name} (ID: {challenge.id}, Price: {challenge.price_mad} MAD)')
         print()
 
-        # Test CMI payment simulation
-        print('1. Testing CMI Payment (2.5 seconds simulation)...')
-        start_time = time.time()
-        payment_service = PaymentService()
-        cmi_payment = payment_service.process_cmi_payment(user.id, challenge.id)
-        cmi_time = time.time() - start_time
-        print('.2f')
-        print(f'   [PAYMENT] Payment ID: {cmi_payment.id}, Status: {cmi_payment.status}')
-        print(f'   [TXN] Transaction ID: {cmi_payment.transaction_id}')
-        print()
+        # The three gateways are independent, so run them side by side
+        if parallel:
+            with ThreadPoolExecutor(max_workers=len(PAYMENT_PROBES)) as pool:
+                futures = [pool.submit(_timed_probe, probe, user.id, challenge.id) for _, probe in PAYMENT_PROBES]
+                results = [future.result() for future in futures]
+        else:
+            results = [_timed_probe(probe, user.id, challenge.id) for _, probe in PAYMENT_PROBES]
 
-        # Test Crypto payment simulation
-        print('2. Testing Crypto Payment (3.5 seconds simulation)...')
-        start_time = time.time()
-        crypto_payment = payment_service.process_crypto_payment(user.id, challenge.id)
-        crypto_time = time.time() - start_time
-        print('.2f')
-        print(f'   [PAYMENT] Payment ID: {crypto_payment.id}, Status: {crypto_payment.status}')
-        print(f'   [TXN] Transaction ID: {crypto_payment.transaction_id}')
-        print()
-
-        # Test PayPal payment simulation
-        print('3. Testing PayPal Payment (2.0 seconds simulation)...')
-        start_time = time.time()
-        paypal_result = payment_service._mock_paypal_payment(user.id, challenge.id)
-        paypal_time = time.time() - start_time
-        print('.2f')
-        print(f'   [PAYMENT] Payment ID: {paypal_result["payment_id"]}, Mock: {paypal_result["mock_payment"]}')
-        print(f'   [ORDER] Order ID: {paypal_result["order_id"]}')
-        print()
+        for (label, _), (elapsed, lines) in zip(PAYMENT_PROBES, results):
+            print(label)
+            print(f'   [TIME] {elapsed:.2f}s')
+            for line in lines:
+                print(line)
+            print()
 
         # Check user challenges created
         print('4. Verifying User Challenges Created:')
@@ -77,4 +94,4 @@ def test_mock_payments():
         print('   [OK] Payments are recorded in the database')
 
 if __name__ == '__main__':
-    test_mock_payments()
\ No newline at end of file
+    test_mock_payments(parallel='--no-parallel' not in sys.argv)
\ No newline at end of file
@@ -1,16 +1,118 @@
-"""BVCscrap - BeautifulSoup-based scraper for market data"""
+"""BVCscrap - HTTP/lxml scraper for market data"""
 import requests
-from bs4 import BeautifulSoup
-import json
-from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+from lxml import etree
+import orjson
+import logging
+from datetime import datetime
 import csv
+import re
+from operator import itemgetter
 import os
 import time
-import random
+import numpy as np
+import threading
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from config import Config
+from utils.csv_validator import is_iso_date, iso_date_mask, load_ohlc_columns
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = pq = None
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+MARKET_TYPES = ('stocks', 'forex', 'crypto', 'morocco')
+
+# USD per MAD when no live rate is available (1 MAD ≈ 0.10 USD)
+USD_MAD_FALLBACK_RATE = 0.10
+
+# Typed sidecar (.npy) written next to each historical CSV once it has been parsed
+_HISTORICAL_DTYPE = np.dtype([('date', 'U32'), ('open', 'f8'), ('high', 'f8'), ('low', 'f8'), ('close', 'f8'), ('volume', 'i8')])
+
+# Casablanca Bourse formats numbers as '2 194,00' / '-0,68%' (spaces may be non-breaking)
+_MOROCCO_NUMBER_JUNK_RE = re.compile(r'\s+')
+_MOROCCO_PERCENT_JUNK_RE = re.compile(r'[\s%]+')
+
+def _cell_text(cell):
+    """Stripped text of a table cell (iterparse yields plain etree elements)"""
+    return ''.join(cell.itertext()).strip()
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+# TradingView scanner requests never change: headers and JSON bodies are built once at import
+_TV_HEADERS = MappingProxyType({
+    'Accept': 'application/json',
+    'Content-Type': 'application/json',
+    'Origin': 'https://www.tradingview.com',
+    'Referer': 'https://www.tradingview.com/screener/'
+})
+
+_STOCKS_BODY = orjson.dumps({
+    "filter": [
+        {
+            "left": "market_cap_basic",
+            "operation": "in_range",
+            "right": [1000000000, 10000000000000]
+        },
+        {
+            "left": "exchange",
+            "operation": "in_range",
+            "right": ["NYSE", "NASDAQ"]
+        }
+    ],
+    "options": {"lang": "en"},
+    "markets": ["america"],
+    "symbols": {"query": {"types": []}, "tickers": []},
+    "columns": ["name", "close", "change", "change_abs"],
+    "sort": {"sortBy": "market_cap_basic", "sortOrder": "desc"},
+    "range": [0, 30]
+})
+
+# Top forex pairs by volume
+_FOREX_BODY = orjson.dumps({
+    "filter": [],
+    "options": {"lang": "en"},
+    "markets": ["forex"],
+    "symbols": {"query": {"types": []}, "tickers": []},
+    "columns": ["name", "close", "change", "change_abs"],
+    "sort": {"sortBy": "change", "sortOrder": "desc"},
+    "range": [0, 30]
+})
+
+_CRYPTO_BODY = orjson.dumps({
+    "filter": [
+        {
+            "left": "market_cap_calc",
+            "operation": "in_range",
+            "right": [1000000, 1000000000000]
+        }
+    ],
+    "options": {"lang": "en"},
+    "markets": ["crypto"],
+    "symbols": {"query": {"types": []}, "tickers": []},
+    "columns": ["name", "close", "change", "change_abs"],
+    "sort": {"sortBy": "market_cap_calc", "sortOrder": "desc"},
+    "range": [0, 30]
+})
 
 class BVCscrap:
     """Scraper for fetching market data from TradingView"""
     
+    # Shared pool so a full refresh fetches every market concurrently (the work is all network I/O)
+    _executor = None
+    _executor_lock = threading.Lock()
+    # Separate single worker for the USD/MAD lookup, so scrapers on _executor never wait on queued work
+    _rate_executor = None
+    
+    # Keep-alive session shared by every scraper so repeat scrapes skip the TCP/TLS handshake
+    _session = None
+    
     def __init__(self, market_type='stocks'):
         """
         Initialize scraper for a specific market type
@@ -30,7 +132,80 @@ class BVCscrap:
         csv_filename = csv_files.get(market_type, 'market_data_stocks.csv')
         csv_path = os.path.join(base_dir, 'data', csv_filename)
         self.csv_path = os.path.abspath(csv_path)
+        self.parquet_path = os.path.splitext(self.csv_path)[0] + '.parquet'
+        self.use_parquet = Config.MARKET_DATA_FORMAT == 'parquet' and PYARROW_AVAILABLE
         self.ensure_data_directory()
+        
+        # HTTP validators of the last saved page; set by scrapers that support conditional GETs
+        self._not_modified = False
+        self._pending_validators = None
+        
+        # Resolve the market's scraper once; unknown markets scrape nothing
+        self._scrape_fn = {
+            'stocks': self.scrape_stocks,
+            'forex': self.scrape_forex,
+            'crypto': self.scrape_crypto,
+            'morocco': self.scrape_morocco
+        }.get(market_type, list)
+    
+    @classmethod
+    def _get_executor(cls):
+        """Return the shared scrape pool, creating it on first use"""
+        if cls._executor is None:
+            with cls._executor_lock:
+                if cls._executor is None:
+                    # One worker per market
+                    cls._executor = ThreadPoolExecutor(max_workers=len(MARKET_TYPES), thread_name_prefix='bvcscrap')
+        return cls._executor
+    
+    @classmethod
+    def _get_rate_executor(cls):
+        """Return the USD/MAD rate lookup pool, creating it on first use"""
+        if cls._rate_executor is None:
+            with cls._executor_lock:
+                if cls._rate_executor is None:
+                    cls._rate_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='bvcscrap-rate')
+        return cls._rate_executor
+    
+    @classmethod
+    def _get_session(cls):
+        """Return the pooled HTTP session, creating it on first use"""
+        if cls._session is None:
+            with cls._executor_lock:
+                if cls._session is None:
+                    session = requests.Session()
+                    # One pool per host (TradingView, Casablanca Bourse, exchange rate API), shared by all markets
+                    session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=8))
+                    session.headers['User-Agent'] = USER_AGENT
+                    cls._session = session
+        return cls._session
+    
+    @classmethod
+    def _fan_out(cls, scrapers, method_name, default):
+        """Run one method on every scraper concurrently; returns {market_type: result}.
+
+        A market whose call raises gets `default`, so one failure never drops the others.
+        """
+        executor = cls._get_executor()
+        futures = {scraper.market_type: executor.submit(getattr(scraper, method_name)) for scraper in scrapers}
+        results = {}
+        for market_type, future in futures.items():
+            try:
+                results[market_type] = future.result()
+            except Exception as e:
+                logger.exception(f"[BVCscrap] {method_name} failed for {market_type}: {e}")
+                results[market_type] = default
+        return results
+    
+    @classmethod
+    def scrape_all_markets(cls, market_types=MARKET_TYPES):
+        """Scrape several markets at once over the shared session; returns {market_type: items}"""
+        return cls._fan_out([cls(market_type=market_type) for market_type in market_types], 'scrape', [])
+    
+    @classmethod
+    def scrape_and_save_all(cls, scrapers):
+        """Scrape and save several markets concurrently; returns {market_type: saved}"""
+        return cls._fan_out(scrapers, 'scrape_and_save', False)
     
     def ensure_data_directory(self):
         """Create data directory if it doesn't exist"""
@@ -42,43 +217,13 @@ class BVCscrap:
         """Scrape top 30 stocks from TradingView screener"""
         try:
             url = "https://scanner.tradingview.com/america/scan"
-            
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'application/json',
-                'Content-Type': 'application/json',
-                'Origin': 'https://www.tradingview.com',
-                'Referer': 'https://www.tradingview.com/screener/'
-            }
-            
-            payload = {
-                "filter": [
-                    {
-                        "left": "market_cap_basic",
-                        "operation": "in_range",
-                        "right": [1000000000, 10000000000000]
-                    },
-                    {
-                        "left": "exchange",
-                        "operation": "in_range",
-                        "right": ["NYSE", "NASDAQ"]
-                    }
-                ],
-                "options": {"lang": "en"},
-                "markets": ["america"],
-                "symbols": {"query": {"types": []}, "tickers": []},
-                "columns": ["name", "close", "change", "change_abs"],
-                "sort": {"sortBy": "market_cap_basic", "sortOrder": "desc"},
-                "range": [0, 30]
-            }
-            
-            response = requests.post(url, json=payload, headers=headers, timeout=10)
+            response = self._get_session().post(url, data=_STOCKS_BODY, headers=_TV_HEADERS, timeout=10)
             
             if response.status_code != 200:
                 print(f"[BVCscrap] Stocks API returned status {response.status_code}")
                 return []
             
-            data = response.json()
+            data = orjson.loads(response.content)
             
             if not data or 'data' not in data:
                 print("[BVCscrap] No stocks data in response")
@@ -118,42 +263,20 @@ class BVCscrap:
             return items
             
         except Exception as e:
-            print(f"[BVCscrap] Stocks scraper error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"[BVCscrap] Stocks scraper error: {e}")
             return []
     
     def scrape_forex(self):
         """Scrape top 30 forex pairs from TradingView"""
         try:
             url = "https://scanner.tradingview.com/forex/scan"
-            
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'application/json',
-                'Content-Type': 'application/json',
-                'Origin': 'https://www.tradingview.com',
-                'Referer': 'https://www.tradingview.com/screener/'
-            }
-            
-            # Top forex pairs by volume
-            payload = {
-                "filter": [],
-                "options": {"lang": "en"},
-                "markets": ["forex"],
-                "symbols": {"query": {"types": []}, "tickers": []},
-                "columns": ["name", "close", "change", "change_abs"],
-                "sort": {"sortBy": "change", "sortOrder": "desc"},
-                "range": [0, 30]
-            }
-            
-            response = requests.post(url, json=payload, headers=headers, timeout=10)
+            response = self._get_session().post(url, data=_FOREX_BODY, headers=_TV_HEADERS, timeout=10)
             
             if response.status_code != 200:
                 print(f"[BVCscrap] Forex API returned status {response.status_code}")
                 return []
             
-            data = response.json()
+            data = orjson.loads(response.content)
             
             if not data or 'data' not in data:
                 print("[BVCscrap] No forex data in response")
@@ -194,47 +317,20 @@ class BVCscrap:
             return items
             
         except Exception as e:
-            print(f"[BVCscrap] Forex scraper error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"[BVCscrap] Forex scraper error: {e}")
             return []
     
     def scrape_crypto(self):
         """Scrape top 30 cryptocurrencies from TradingView"""
         try:
             url = "https://scanner.tradingview.com/crypto/scan"
-            
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'application/json',
-                'Content-Type': 'application/json',
-                'Origin': 'https://www.tradingview.com',
-                'Referer': 'https://www.tradingview.com/screener/'
-            }
-            
-            payload = {
-                "filter": [
-                    {
-                        "left": "market_cap_calc",
-                        "operation": "in_range",
-                        "right": [1000000, 1000000000000]
-                    }
-                ],
-                "options": {"lang": "en"},
-                "markets": ["crypto"],
-                "symbols": {"query": {"types": []}, "tickers": []},
-                "columns": ["name", "close", "change", "change_abs"],
-                "sort": {"sortBy": "market_cap_calc", "sortOrder": "desc"},
-                "range": [0, 30]
-            }
-            
-            response = requests.post(url, json=payload, headers=headers, timeout=10)
+            response = self._get_session().post(url, data=_CRYPTO_BODY, headers=_TV_HEADERS, timeout=10)
             
             if response.status_code != 200:
                 print(f"[BVCscrap] Crypto API returned status {response.status_code}")
                 return []
             
-            data = response.json()
+            data = orjson.loads(response.content)
             
             if not data or 'data' not in data:
                 print("[BVCscrap] No crypto data in response")
@@ -280,129 +376,136 @@ class BVCscrap:
             return items
             
         except Exception as e:
-            print(f"[BVCscrap] Crypto scraper error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"[BVCscrap] Crypto scraper error: {e}")
             return []
     
     def scrape_morocco(self):
         """Scrape all Moroccan stocks from Casablanca Stock Exchange live market page"""
         try:
-            items = []
             timestamp = datetime.utcnow().isoformat()
             
             url = "https://www.casablanca-bourse.com/en/live-market/marche-actions-groupement"
             headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
                 'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
                 'Accept-Language': 'en-US,en;q=0.5',
             }
+            headers.update(self._conditional_headers())
             
-            print(f"[BVCscrap] Fetching Moroccan stocks from: {url}")
-            response = requests.get(url, headers=headers, timeout=15, verify=False)
-            
-            if response.status_code != 200:
-                print(f"[BVCscrap] Morocco page returned status {response.status_code}")
-                return []
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            tables = soup.find_all('table')
+            # Resolve the USD/MAD rate (usually from cache) while the page downloads
+            rate_future = self._get_rate_executor().submit(self._get_usd_mad_rate)
             
-            print(f"[BVCscrap] Found {len(tables)} tables on Morocco page")
-            
-            for table_idx, table in enumerate(tables):
-                tbody = table.find('tbody')
-                if not tbody:
-                    continue
+            print(f"[BVCscrap] Fetching Moroccan stocks from: {url}")
+            # Stream the page into libxml2 and handle each table row as it arrives
+            with self._get_session().get(url, headers=headers, timeout=15, verify=False, stream=True) as response:
+                if response.status_code == 304:
+                    print("[BVCscrap] Morocco page not modified since last scrape")
+                    self._not_modified = True
+                    return []
+                if response.status_code != 200:
+                    print(f"[BVCscrap] Morocco page returned status {response.status_code}")
+                    return []
                 
-                rows = tbody.find_all('tr')
-                for row in rows:
-                    cells = row.find_all(['td', 'th'])
-                    if len(cells) < 8:  # Need at least 8 columns (Instrument, Status, Reference, Opening, Close, Quantity, Volume, Change %)
-                        continue
-                    
-                    try:
-                        # Extract data from cells
-                        # Column 0: Instrument name
-                        instrument = cells[0].get_text(strip=True)
-                        if not instrument or instrument == 'Instrument':
-                            continue
-                        
-                        # Column 1: Status (T = Traded, N.T = Not Traded, S = Suspended)
-                        status = cells[1].get_text(strip=True)
-                        
-                        # Column 2: Reference price
-                        reference_text = cells[2].get_text(strip=True)
-                        reference_price = self._parse_morocco_number(reference_text)
-                        
-                        # Column 3: Opening price
-                        opening_text = cells[3].get_text(strip=True)
-                        opening_price = self._parse_morocco_number(opening_text)
-                        
-                        # Column 4: Close price (current price)
-                        close_text = cells[4].get_text(strip=True)
-                        close_price = self._parse_morocco_number(close_text)
-                        
-                        # Column 7: Change in %
-                        change_percent_text = cells[7].get_text(strip=True)
-                        change_percent = self._parse_morocco_percent(change_percent_text)
-                        
-                        # Skip if no valid price data or status indicates not traded/suspended
-                        if close_price <= 0 and status in ['N.T', 'S']:
-                            continue
-                        
-                        # Use close price as current price, fallback to reference if close is 0
-                        current_price = close_price if close_price > 0 else reference_price
-                        
-                        if current_price <= 0:
-                            continue
-                        
-                        # Calculate change from reference price
-                        change = current_price - reference_price if reference_price > 0 else 0.0
-                        
-                        # Extract symbol from instrument name (usually first word or acronym)
-                        symbol = self._extract_symbol_from_instrument(instrument)
-                        
-                        # Convert MAD to USD (approximate rate: 1 MAD ≈ 0.10 USD)
-                        # We'll use a cached rate or fetch it
-                        usd_rate = self._get_usd_mad_rate()
-                        price_usd = current_price * usd_rate
-                        change_usd = change * usd_rate
-                        
-                        items.append({
-                            'symbol': symbol,
-                            'name': instrument,
-                            'price': price_usd,  # Store USD price as main price
-                            'price_mad': current_price,  # Keep MAD price for reference
-                            'change': change_usd,  # Change in USD
-                            'change_mad': change,  # Change in MAD
-                            'change_percent': change_percent,
-                            'timestamp': timestamp,
-                            'source': 'casablanca-bourse',
-                            'currency': 'USD'
-                        })
-                        
-                    except (ValueError, IndexError, AttributeError) as e:
-                        print(f"[BVCscrap] Error parsing row in table {table_idx + 1}: {e}")
-                        continue
+                # Convert MAD to USD (approximate rate: 1 MAD ≈ 0.10 USD); one rate for the whole page
+                try:
+                    usd_rate = rate_future.result(timeout=self._usd_mad_rate_wait)
+                except FuturesTimeoutError:
+                    print("[BVCscrap] USD/MAD rate lookup timed out, using fallback rate")
+                    usd_rate = USD_MAD_FALLBACK_RATE
+                
+                response.raw.decode_content = True
+                items = self._parse_morocco_rows(response.raw, usd_rate, timestamp)
+                
+                # Persisted by scrape_and_save once the rows are actually saved
+                self._pending_validators = {
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                }
             
             print(f"[BVCscrap] Successfully scraped {len(items)} Moroccan stocks from Casablanca Bourse")
             return items
         
         except Exception as e:
-            print(f"[BVCscrap] Morocco scraper error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"[BVCscrap] Morocco scraper error: {e}")
             return []
     
+    def _parse_morocco_rows(self, source, usd_rate, timestamp):
+        """Parse Casablanca Bourse table rows from an HTML byte stream into market items"""
+        items = []
+        row_idx = 0
+        for _, row in etree.iterparse(source, events=('end',), tag='tr', html=True):
+            # Only table body rows; header/footer rows are skipped
+            parent = row.getparent()
+            in_body = parent is not None and parent.tag == 'tbody'
+            
+            # Extract every cell's text in one pass, then free the row
+            texts = [_cell_text(cell) for cell in row if cell.tag in ('td', 'th')] if in_body else []
+            row.clear()
+            if len(texts) < 8:  # Need at least 8 columns (Instrument, Status, Reference, Opening, Close, Quantity, Volume, Change %)
+                continue
+            
+            row_idx += 1
+            try:
+                # Column 0: Instrument name
+                instrument = texts[0]
+                if not instrument or instrument == 'Instrument':
+                    continue
+                
+                # Column 1: Status (T = Traded, N.T = Not Traded, S = Suspended)
+                status = texts[1]
+                
+                # Column 2: Reference price
+                reference_price = self._parse_morocco_number(texts[2])
+                
+                # Column 4: Close price (current price)
+                close_price = self._parse_morocco_number(texts[4])
+                
+                # Column 7: Change in %
+                change_percent = self._parse_morocco_percent(texts[7])
+                
+                # Skip if no valid price data or status indicates not traded/suspended
+                if close_price <= 0 and status in ['N.T', 'S']:
+                    continue
+                
+                # Use close price as current price, fallback to reference if close is 0
+                current_price = close_price if close_price > 0 else reference_price
+                
+                if current_price <= 0:
+                    continue
+                
+                # Calculate change from reference price
+                change = current_price - reference_price if reference_price > 0 else 0.0
+                
+                # Extract symbol from instrument name (usually first word or acronym)
+                symbol = self._extract_symbol_from_instrument(instrument)
+                
+                price_usd = current_price * usd_rate
+                change_usd = change * usd_rate
+                
+                items.append({
+                    'symbol': symbol,
+                    'name': instrument,
+                    'price': price_usd,  # Store USD price as main price
+                    'price_mad': current_price,  # Keep MAD price for reference
+                    'change': change_usd,  # Change in USD
+                    'change_mad': change,  # Change in MAD
+                    'change_percent': change_percent,
+                    'timestamp': timestamp,
+                    'source': 'casablanca-bourse',
+                    'currency': 'USD'
+                })
+                
+            except (ValueError, IndexError, AttributeError) as e:
+                print(f"[BVCscrap] Error parsing Morocco row {row_idx}: {e}")
+                continue
+        return items
+    
     def _parse_morocco_number(self, text):
         """Helper to parse Moroccan number format (e.g., '2 194,00' or '950,10')"""
         if not text or text == '-' or text.strip() == '':
             return 0.0
         try:
             # Remove spaces (thousand separators) and replace comma with dot (decimal separator)
-            cleaned = text.replace(' ', '').replace(',', '.').strip()
-            return float(cleaned)
+            return float(_MOROCCO_NUMBER_JUNK_RE.sub('', text).replace(',', '.'))
         except (ValueError, AttributeError):
             return 0.0
     
@@ -412,11 +515,55 @@ class BVCscrap:
             return 0.0
         try:
             # Remove % and parse as number
-            cleaned = text.replace('%', '').replace(' ', '').replace(',', '.').strip()
-            return float(cleaned)
+            return float(_MOROCCO_PERCENT_JUNK_RE.sub('', text).replace(',', '.'))
         except (ValueError, AttributeError):
             return 0.0
     
+    # Map common full instrument names (upper-cased) to symbols; built once at import
+    _SYMBOL_MAP = {
+        'TAQA MOROCCO': 'TAQA',
+        'SODEP-MARSA MAROC': 'SODEP',
+        'ARADEI CAPITAL': 'ARADEI',
+        'BALIMA': 'BALO',
+        'CARTIER SAADA': 'CARTIER',
+        'COSUMAR': 'COSUMAR',
+        'AFMA': 'AFMA',
+        'AGMA': 'AGMA',
+        'AFRIC INDUSTRIES SA': 'AFRI',
+        'ALUMINIUM DU MAROC': 'ALM',
+        'ATTIJARIWAFA BANK': 'ATW',
+        'BANK OF AFRICA': 'BOA',
+        'OULMES': 'OULMES',
+        'SOCIETE DES BOISSONS DU MAROC': 'SBM',
+        'MAGHREB OXYGENE': 'MAGHREB',
+        'SNEP': 'SNEP',
+        'AUTO HALL': 'AUTO HALL',
+        'AUTO NEJMA': 'NEJMA',
+        'DELATTRE LEVIVIER MAROC': 'DELATTRE',
+        'STROC INDUSTRIE': 'STROC',
+        'ALLIANCES': 'ALLIANCES',
+        'DOUJA PROM ADDOHA': 'DOUJA',
+        'RISMA': 'RISMA',
+        'DISTY TECHNOLOGIES': 'DISTY',
+        'DISWAY': 'DISWAY',
+        'MANAGEM': 'MANAGEM',
+        'MINIERE TOUISSIT': 'MINIERE',
+        'AFRIQUIA GAZ': 'AFRIQUIA',
+        'SAMIR': 'SAMIR',
+        'PROMOPHARM S.A.': 'PROMOPHARM',
+        'SOTHEMA': 'SOTHEMA',
+        'MED PAPER': 'MED PAPER',
+        'CASH PLUS S.A': 'CASH PLUS',
+        'DIAC SALAF': 'DIAC',
+        'DELTA HOLDING': 'DELTA',
+        'ZELLIDJA S.A': 'ZELLIDJA',
+        'ITISALAT AL-MAGHRIB': 'IAM',
+        'CTM': 'CTM',
+        'AKDITAL': 'AKD',
+        'VICENNE': 'VICENNE',
+        'CMGP GROUP': 'CMGP',
+    }
+    
     def _extract_symbol_from_instrument(self, instrument_name):
         """Extract stock symbol from full instrument name"""
         if not instrument_name:
@@ -430,54 +577,10 @@ class BVCscrap:
         # Remove common suffixes
         name = instrument_name.upper().strip()
         
-        # Map common full names to symbols
-        symbol_map = {
-            'TAQA MOROCCO': 'TAQA',
-            'SODEP-MARSA MAROC': 'SODEP',
-            'ARADEI CAPITAL': 'ARADEI',
-            'BALIMA': 'BALO',
-            'CARTIER SAADA': 'CARTIER',
-            'COSUMAR': 'COSUMAR',
-            'AFMA': 'AFMA',
-            'AGMA': 'AGMA',
-            'AFRIC INDUSTRIES SA': 'AFRI',
-            'ALUMINIUM DU MAROC': 'ALM',
-            'ATTIJARIWAFA BANK': 'ATW',
-            'BANK OF AFRICA': 'BOA',
-            'OULMES': 'OULMES',
-            'SOCIETE DES BOISSONS DU MAROC': 'SBM',
-            'MAGHREB OXYGENE': 'MAGHREB',
-            'SNEP': 'SNEP',
-            'AUTO HALL': 'AUTO HALL',
-            'AUTO NEJMA': 'NEJMA',
-            'DELATTRE LEVIVIER MAROC': 'DELATTRE',
-            'STROC INDUSTRIE': 'STROC',
-            'ALLIANCES': 'ALLIANCES',
-            'DOUJA PROM ADDOHA': 'DOUJA',
-            'RISMA': 'RISMA',
-            'DISTY TECHNOLOGIES': 'DISTY',
-            'DISWAY': 'DISWAY',
-            'MANAGEM': 'MANAGEM',
-            'MINIERE TOUISSIT': 'MINIERE',
-            'AFRIQUIA GAZ': 'AFRIQUIA',
-            'SAMIR': 'SAMIR',
-            'PROMOPHARM S.A.': 'PROMOPHARM',
-            'SOTHEMA': 'SOTHEMA',
-            'MED PAPER': 'MED PAPER',
-            'CASH PLUS S.A': 'CASH PLUS',
-            'DIAC SALAF': 'DIAC',
-            'DELTA HOLDING': 'DELTA',
-            'ZELLIDJA S.A': 'ZELLIDJA',
-            'ITISALAT AL-MAGHRIB': 'IAM',
-            'CTM': 'CTM',
-            'AKDITAL': 'AKD',
-            'VICENNE': 'VICENNE',
-            'CMGP GROUP': 'CMGP',
-        }
-        
         # Check if we have a direct mapping
-        if name in symbol_map:
-            return symbol_map[name]
+        symbol = self._SYMBOL_MAP.get(name)
+        if symbol:
+            return symbol
         
         # Try to extract from first word or acronym
         words = name.split()
@@ -506,143 +609,324 @@ class BVCscrap:
     _usd_mad_rate_cache = None
     _usd_mad_rate_cache_time = 0
     _usd_mad_rate_cache_ttl = 3600  # Cache for 1 hour
+    _usd_mad_rate_wait = 10  # Seconds scrape_morocco waits for the lookup before using the fallback
+    
+    def _usd_mad_rate_path(self):
+        """On-disk copy of the last fetched rate, shared with short-lived scraper processes"""
+        return os.path.join(os.path.dirname(self.csv_path), '.usd_mad.json')
+    
+    def _read_usd_mad_rate_file(self, current_time):
+        """Return the rate saved on disk if it is still within the TTL, else None"""
+        try:
+            with open(self._usd_mad_rate_path(), 'rb') as f:
+                saved = orjson.loads(f.read())
+            if current_time - saved['ts'] < self._usd_mad_rate_cache_ttl:
+                return saved['ts'], float(saved['rate'])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+    
+    def _write_usd_mad_rate_file(self, rate, current_time):
+        """Persist a fetched rate atomically (temp file + os.replace)"""
+        path = self._usd_mad_rate_path()
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps({'rate': rate, 'ts': current_time}))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[BVCscrap] Could not save USD/MAD rate: {e}")
     
     def _get_usd_mad_rate(self):
-        """Get USD/MAD exchange rate, with caching"""
+        """Get USD/MAD exchange rate, with caching in memory and on disk"""
         current_time = time.time()
         
         # Return cached rate if still valid
         if self._usd_mad_rate_cache and (current_time - self._usd_mad_rate_cache_time) < self._usd_mad_rate_cache_ttl:
             return self._usd_mad_rate_cache
         
+        # A previous process may have fetched it recently
+        saved = self._read_usd_mad_rate_file(current_time)
+        if saved:
+            BVCscrap._usd_mad_rate_cache_time, BVCscrap._usd_mad_rate_cache = saved
+            return BVCscrap._usd_mad_rate_cache
+        
         # Try to fetch live rate from free API
         try:
             # Using exchangerate-api.com (free tier: 1500 requests/month)
-            response = requests.get('https://api.exchangerate-api.com/v4/latest/USD', timeout=5)
+            response = self._get_session().get('https://api.exchangerate-api.com/v4/latest/USD', timeout=5)
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 mad_rate = data.get('rates', {}).get('MAD', None)
                 if mad_rate:
                     # Convert to USD per MAD (1 MAD = 1/USD_MAD_rate USD)
                     usd_per_mad = 1.0 / mad_rate
-                    self._usd_mad_rate_cache = usd_per_mad
-                    self._usd_mad_rate_cache_time = current_time
+                    BVCscrap._usd_mad_rate_cache = usd_per_mad
+                    BVCscrap._usd_mad_rate_cache_time = current_time
+                    self._write_usd_mad_rate_file(usd_per_mad, current_time)
                     print(f"[BVCscrap] Fetched USD/MAD rate: {usd_per_mad:.6f}")
                     return usd_per_mad
         except Exception as e:
             print(f"[BVCscrap] Error fetching USD/MAD rate: {e}, using fallback rate")
         
         # Fallback to approximate rate (1 MAD ≈ 0.10 USD)
-        fallback_rate = 0.10
-        self._usd_mad_rate_cache = fallback_rate
-        self._usd_mad_rate_cache_time = current_time
+        fallback_rate = USD_MAD_FALLBACK_RATE
+        BVCscrap._usd_mad_rate_cache = fallback_rate
+        BVCscrap._usd_mad_rate_cache_time = current_time
         return fallback_rate
     
     def scrape(self):
         """Scrape data based on market type"""
-        if self.market_type == 'stocks':
-            return self.scrape_stocks()
-        elif self.market_type == 'forex':
-            return self.scrape_forex()
-        elif self.market_type == 'crypto':
-            return self.scrape_crypto()
-        elif self.market_type == 'morocco':
-            return self.scrape_morocco()
-        else:
-            return []
+        return self._scrape_fn()
+    
+    def _fieldnames(self):
+        """Columns stored for this market type"""
+        base_fieldnames = ['symbol', 'name', 'price', 'change', 'change_percent', 'timestamp', 'source']
+        if self.market_type == 'morocco':
+            # Add MAD fields for Moroccan stocks
+            return base_fieldnames + ['price_mad', 'change_mad', 'currency']
+        return base_fieldnames
+    
+    # Numeric snapshot columns; every other column is stored as a string
+    _FLOAT_FIELDS = frozenset(('price', 'change', 'change_percent', 'price_mad', 'change_mad'))
+    
+    def _parquet_schema(self, fieldnames):
+        """Explicit Parquet schema, so the column types never depend on the first row's values"""
+        return pa.schema([
+            (name, pa.float64() if name in self._FLOAT_FIELDS else pa.string())
+            for name in fieldnames
+        ])
     
     def save_to_csv(self, items):
-        """Save market data to CSV file"""
+        """Save market data to CSV file (or the Parquet snapshot when MARKET_DATA_FORMAT=parquet)"""
         if not items:
             print(f"[BVCscrap] No {self.market_type} data to save")
             return False
         
+        fieldnames = self._fieldnames()
+        target_path = self.parquet_path if self.use_parquet else self.csv_path
+        
+        # Write beside the target and swap it in, so readers never see a half-written file
+        tmp_path = f"{target_path}.{os.getpid()}.tmp"
         try:
-            # Write to CSV
-            with open(self.csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-                # Determine fieldnames based on market type
-                base_fieldnames = ['symbol', 'name', 'price', 'change', 'change_percent', 'timestamp', 'source']
-                if self.market_type == 'morocco':
-                    # Add MAD fields for Moroccan stocks
-                    fieldnames = base_fieldnames + ['price_mad', 'change_mad', 'currency']
-                else:
-                    fieldnames = base_fieldnames
-                
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                
-                writer.writeheader()
-                for item in items:
-                    writer.writerow(item)
+            rows = self._normalize_rows(items, fieldnames)
+            if self.use_parquet:
+                # Typed, snappy-compressed columns; read back without any per-row float() calls
+                table = pa.Table.from_pylist(rows, schema=self._parquet_schema(fieldnames))
+                pq.write_table(table, tmp_path, compression='snappy')
+            else:
+                with open(tmp_path, 'w', newline='', encoding='utf-8', buffering=1 << 16) as csvfile:
+                    # Scraped rows only carry known fields, so skip DictWriter's per-row extra-key check
+                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames, restval='', extrasaction='ignore')
+                    
+                    writer.writeheader()
+                    # The normalized rows, so a cold read returns exactly what is cached below
+                    writer.writerows(rows)
+            os.replace(tmp_path, target_path)
             
-            print(f"[BVCscrap] Saved {len(items)} {self.market_type} items to {self.csv_path}")
+            # Readers in this process get the rows just written without re-parsing the file
+            self._prime_csv_cache(target_path, rows)
+            
+            print(f"[BVCscrap] Saved {len(rows)} {self.market_type} items to {target_path}")
             return True
         except Exception as e:
-            print(f"[BVCscrap] Error saving {self.market_type} to CSV: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"[BVCscrap] Error saving {self.market_type} to CSV: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
             return False
     
+    def _normalize_rows(self, items, fieldnames):
+        """Scraped items in read_from_csv's shape (typed values, MAD fields only when present)"""
+        extra_numbers = [field for field in ('price_mad', 'change_mad') if field in fieldnames]
+        has_currency = 'currency' in fieldnames
+        
+        rows = []
+        for item in items:
+            if not item.get('symbol') or item.get('price') in (None, ''):
+                continue
+            row = {
+                'symbol': item['symbol'],
+                'name': item.get('name') or '',
+                'price': float(item['price']),
+                'change': float(item.get('change') or 0),
+                'change_percent': float(item.get('change_percent') or 0),
+                'timestamp': item.get('timestamp') or '',
+                'source': item.get('source') or ''
+            }
+            for field in extra_numbers:
+                if item.get(field) not in (None, ''):
+                    row[field] = float(item[field])
+            if has_currency:
+                row['currency'] = item.get('currency') or ''
+            rows.append(row)
+        return rows
+    
+    def _prime_csv_cache(self, path, rows):
+        """Cache freshly written rows keyed by the new file's mtime/size"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        self._csv_cache[path] = ((stat.st_mtime_ns, stat.st_size), rows)
+    
+    def _validators_path(self):
+        """ETag/Last-Modified of the page behind the saved data, kept next to the CSV"""
+        return f"{self.csv_path}.etag"
+    
+    def _conditional_headers(self):
+        """If-None-Match / If-Modified-Since for a conditional GET, when saved data exists"""
+        if not os.path.exists(self.parquet_path if self.use_parquet else self.csv_path):
+            return {}
+        try:
+            with open(self._validators_path(), 'rb') as f:
+                saved = orjson.loads(f.read())
+        except (OSError, ValueError):
+            return {}
+        
+        headers = {}
+        if saved.get('etag'):
+            headers['If-None-Match'] = saved['etag']
+        if saved.get('last_modified'):
+            headers['If-Modified-Since'] = saved['last_modified']
+        return headers
+    
+    def _save_validators(self, validators):
+        """Persist HTTP validators atomically so restarts keep sending conditional GETs"""
+        path = self._validators_path()
+        try:
+            if not validators or not any(validators.values()):
+                if os.path.exists(path):
+                    os.remove(path)
+                return
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps(validators))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[BVCscrap] Could not save HTTP validators: {e}")
+    
     def scrape_and_save(self):
-        """Scrape data and save to CSV"""
+        """Scrape data and save to CSV (skipped when the upstream page is unchanged)"""
         print(f"[BVCscrap] Starting {self.market_type} scrape at {datetime.utcnow()}")
+        self._not_modified = False
+        self._pending_validators = None
         items = self.scrape()
-        if items:
-            return self.save_to_csv(items)
+        if self._not_modified:
+            return True  # Saved data is still current
+        if items and self.save_to_csv(items):
+            if self._pending_validators is not None:
+                self._save_validators(self._pending_validators)
+            return True
         return False
     
+    # Parsed CSV rows keyed by path, reused while the file's mtime/size are unchanged
+    _csv_cache = {}
+    
     def read_from_csv(self):
-        """Read market data from CSV file"""
+        """Read market data from CSV file (or the Parquet snapshot when MARKET_DATA_FORMAT=parquet)"""
         # Normalize path to absolute path
-        csv_path = os.path.abspath(self.csv_path)
+        csv_path = os.path.abspath(self.parquet_path if self.use_parquet else self.csv_path)
         
-        if not os.path.exists(csv_path):
+        try:
+            stat = os.stat(csv_path)
+        except OSError:
             print(f"[BVCscrap] CSV file not found: {csv_path}")
             return []
         
+        file_key = (stat.st_mtime_ns, stat.st_size)
+        cached = self._csv_cache.get(csv_path)
+        if cached and cached[0] == file_key:
+            return cached[1]
+        
+        if self.use_parquet:
+            try:
+                # Columns are already typed; only drop the nulls from_pylist filled in for absent MAD fields
+                items = [
+                    {key: value for key, value in row.items() if value is not None}
+                    for row in pq.read_table(csv_path).to_pylist()
+                ]
+            except Exception as e:
+                print(f"[BVCscrap] Error reading {self.market_type} from Parquet: {e}")
+                return []
+            self._csv_cache[csv_path] = (file_key, items)
+            return items
+        
         try:
             items = []
-            with open(csv_path, 'r', encoding='utf-8') as csvfile:
-                reader = csv.DictReader(csvfile)
+            with open(csv_path, 'r', encoding='utf-8', newline='') as csvfile:
+                reader = csv.reader(csvfile)
+                header = next(reader, None)
+                if not header:
+                    return []
+                
+                # Resolve column positions once instead of building a dict per row
+                col = {name: i for i, name in enumerate(header)}
+                width = len(header)
+                i_symbol = col.get('symbol')
+                i_price = col.get('price')
+                if i_symbol is None or i_price is None:
+                    return []
+                i_name = col.get('name')
+                i_change = col.get('change')
+                i_change_percent = col.get('change_percent')
+                i_timestamp = col.get('timestamp')
+                i_source = col.get('source')
+                i_price_mad = col.get('price_mad')
+                i_change_mad = col.get('change_mad')
+                i_currency = col.get('currency')
+                
                 for row in reader:
+                    if len(row) < width:
+                        row += [''] * (width - len(row))
                     # Skip empty rows
-                    if not row.get('symbol') or not row.get('price'):
+                    if not row[i_symbol] or not row[i_price]:
                         continue
                     item = {
-                        'symbol': row['symbol'],
-                        'name': row.get('name', ''),
-                        'price': float(row['price']),
-                        'change': float(row.get('change', 0)),
-                        'change_percent': float(row.get('change_percent', 0)),
-                        'timestamp': row.get('timestamp', ''),
-                        'source': row.get('source', 'tradingview')
+                        'symbol': row[i_symbol],
+                        'name': row[i_name] if i_name is not None else '',
+                        'price': float(row[i_price]),
+                        'change': float(row[i_change] or 0) if i_change is not None else 0.0,
+                        'change_percent': float(row[i_change_percent] or 0) if i_change_percent is not None else 0.0,
+                        'timestamp': row[i_timestamp] if i_timestamp is not None else '',
+                        'source': row[i_source] if i_source is not None else 'tradingview'
                     }
                     # Add MAD fields if they exist (for Moroccan stocks)
-                    if 'price_mad' in row and row['price_mad']:
-                        item['price_mad'] = float(row['price_mad'])
-                    if 'change_mad' in row and row['change_mad']:
-                        item['change_mad'] = float(row['change_mad'])
-                    if 'currency' in row:
-                        item['currency'] = row['currency']
+                    if i_price_mad is not None and row[i_price_mad]:
+                        item['price_mad'] = float(row[i_price_mad])
+                    if i_change_mad is not None and row[i_change_mad]:
+                        item['change_mad'] = float(row[i_change_mad])
+                    if i_currency is not None:
+                        item['currency'] = row[i_currency]
                     items.append(item)
+            self._csv_cache[csv_path] = (file_key, items)
             print(f"[BVCscrap] Successfully read {len(items)} {self.market_type} items from CSV: {csv_path}")
             return items
         except Exception as e:
-            import traceback
-            print(f"[BVCscrap] Error reading {self.market_type} from CSV: {e}")
-            traceback.print_exc()
+            logger.exception(f"[BVCscrap] Error reading {self.market_type} from CSV: {e}")
             return []
 
+    # {SYMBOL: row} per snapshot file, rebuilt only when read_from_csv hands back a new row list
+    _symbol_index_cache = {}
+    
+    def find_symbol(self, symbol):
+        """Current row for a symbol (case-insensitive), or None"""
+        items = self.read_from_csv()
+        path = self.parquet_path if self.use_parquet else self.csv_path
+        cached = self._symbol_index_cache.get(path)
+        if cached is None or cached[0] is not items:
+            index = {}
+            for item in items:
+                # First occurrence wins, as with the old linear scans
+                index.setdefault(item['symbol'].upper(), item)
+            cached = (items, index)
+            self._symbol_index_cache[path] = cached
+        return cached[1].get(symbol.upper())
+
     def generate_historical_data(self, symbol, days=365):
         """Generate historical OHLC data for a symbol"""
         try:
             # Get current price data
-            current_data = self.read_from_csv()
-            symbol_data = None
-
-            for item in current_data:
-                if item['symbol'].upper() == symbol.upper():
-                    symbol_data = item
-                    break
+            symbol_data = self.find_symbol(symbol)
 
             if not symbol_data:
                 print(f"[BVCscrap] Symbol {symbol} not found in current data")
@@ -652,63 +936,54 @@ class BVCscrap:
             current_price = float(symbol_data['price'])
             base_date = datetime.utcnow().date()
 
-            historical_data = []
+            # All randomness in three block draws from one PCG64 generator
+            rng = np.random.default_rng()
+            normals = rng.standard_normal((days, 3))  # [daily change, daily volatility, intraday range]
+            uniforms = rng.uniform(-1.0, 1.0, (days, 3))  # [trend, open jitter, volume jitter]
+            base_volumes = rng.integers(10000, 1000001, days)  # 10K to 1M shares
+
+            # Random walk backwards from today (day 0 is the current price)
+            volatility = 0.02  # 2% daily volatility
+            factors = 1 + uniforms[:, 0] * 0.001 + normals[:, 0] * volatility  # Small daily trend + normal change
+            factors[:1] = 1.0
+
+            # Ensure price doesn't go negative or too extreme (cap at 10x current price)
+            closes = np.clip(current_price * np.cumprod(factors), 0.01, current_price * 10)
+
+            # Create realistic OHLC around each close
+            daily_volatility = np.abs(normals[:, 1]) * 0.01
+            opens = closes * (1 + uniforms[:, 1] * daily_volatility)
+            intraday_range = np.abs(normals[:, 2]) * daily_volatility * 2
+            highs = np.maximum(opens, closes) * (1 + intraday_range)
+            lows = np.minimum(opens, closes) * (1 - intraday_range)
+
+            # Generate volume (+/-50% around the base)
+            volumes = (base_volumes * (1 + uniforms[:, 2] * 0.5)).astype(np.int64)
 
-            # Generate data for the specified number of days
-            for i in range(days):
-                date = base_date - timedelta(days=i)
-                date_str = date.isoformat()
-
-                # For the most recent data (i=0), use current price
-                if i == 0:
-                    price = current_price
-                else:
-                    # Generate realistic price movements
-                    # Use a random walk with some trend and volatility
-                    volatility = 0.02  # 2% daily volatility
-                    trend = random.uniform(-0.001, 0.001)  # Small daily trend
-                    change = random.gauss(0, volatility)  # Normal distribution
-                    price = price * (1 + trend + change)
-
-                    # Ensure price doesn't go negative or too extreme
-                    price = max(price, 0.01)
-                    price = min(price, current_price * 10)  # Cap at 10x current price
-
-                # Generate OHLC data
-                daily_volatility = abs(random.gauss(0, 0.01))  # Daily volatility
-
-                # Create realistic OHLC
-                open_price = price * (1 + random.uniform(-daily_volatility, daily_volatility))
-                close_price = price
-
-                # High and low based on intraday movement
-                intraday_range = abs(random.gauss(0, daily_volatility * 2))
-                high_price = max(open_price, close_price) * (1 + intraday_range)
-                low_price = min(open_price, close_price) * (1 - intraday_range)
-
-                # Generate volume (realistic trading volume)
-                base_volume = random.randint(10000, 1000000)  # 10K to 1M shares
-                volume = int(base_volume * (1 + random.uniform(-0.5, 0.5)))
-
-                historical_data.append({
+            # Round each column once in NumPy instead of per row per field
+            ohlc = np.round(np.stack((opens, highs, lows, closes)), 4)
+
+            # Index 0 is today, so reverse everything to get oldest first
+            dates = (np.datetime64(base_date, 'D') - np.arange(days)[::-1]).astype(str)
+            historical_data = [
+                {
                     'date': date_str,
-                    'open': round(open_price, 4),
-                    'high': round(high_price, 4),
-                    'low': round(low_price, 4),
-                    'close': round(close_price, 4),
+                    'open': open_price,
+                    'high': high_price,
+                    'low': low_price,
+                    'close': close_price,
                     'volume': volume
-                })
-
-            # Sort by date (oldest first)
-            historical_data.sort(key=lambda x: x['date'])
+                }
+                for date_str, open_price, high_price, low_price, close_price, volume in zip(
+                    dates.tolist(), *ohlc[:, ::-1].tolist(), volumes[::-1].tolist()
+                )
+            ]
 
             print(f"[BVCscrap] Generated {len(historical_data)} days of historical data for {symbol}")
             return historical_data
 
         except Exception as e:
-            print(f"[BVCscrap] Error generating historical data: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"[BVCscrap] Error generating historical data: {e}")
             return []
 
     def save_historical_data(self, symbol, historical_data, timeframe='daily'):
@@ -725,21 +1000,94 @@ class BVCscrap:
             # Write to CSV
             with open(filepath, 'w', newline='', encoding='utf-8') as csvfile:
                 fieldnames = ['date', 'open', 'high', 'low', 'close', 'volume']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-
-                for row in historical_data:
-                    writer.writerow(row)
+                writer = csv.writer(csvfile)
+                writer.writerow(fieldnames)
+                # Ordered tuples via itemgetter; writerows runs the loop in C and quotes as needed
+                writer.writerows(map(itemgetter(*fieldnames), historical_data))
 
             print(f"[BVCscrap] Saved {len(historical_data)} historical records to {filepath}")
             return filepath
 
         except Exception as e:
-            print(f"[BVCscrap] Error saving historical data: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"[BVCscrap] Error saving historical data: {e}")
+            return None
+
+    def _read_historical_columns(self, filepath, symbol):
+        """Vectorized read of a historical CSV; None if the file needs the row-by-row path"""
+        table = load_ohlc_columns(filepath)
+        if table is None:
             return None
 
+        dates = np.char.strip(table['date'])
+        # Same acceptance as the per-row check (is_iso_date); other dates go to the row path
+        date_ok = iso_date_mask(dates)
+        if not np.all(date_ok | (dates == '')):
+            return None
+
+        opens, highs, lows, closes = table['open'], table['high'], table['low'], table['close']
+        volumes = table['volume'].astype(np.int64)  # Handle float strings that should be int
+
+        # Ensure positive values and a date on every kept row
+        valid = (dates != '') & (opens > 0) & (highs > 0) & (lows > 0) & (closes > 0) & (volumes > 0)
+
+        # Validate OHLC relationships (warnings only, as in the row path)
+        high_warnings = np.count_nonzero(valid & (highs < np.maximum(opens, closes)))
+        low_warnings = np.count_nonzero(valid & (lows > np.minimum(opens, closes)))
+        if high_warnings or low_warnings:
+            print(f"[BVCscrap] Warning: {high_warnings} rows with high < max(open,close), "
+                  f"{low_warnings} rows with low > min(open,close) in {filepath}")
+
+        skipped = len(table) - np.count_nonzero(valid)
+        if skipped:
+            print(f"[BVCscrap] Skipping {skipped} rows with missing or non-positive values in {filepath}")
+
+        historical_data = [
+            {'date': date_str, 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+            for date_str, o, h, l, c, v in zip(
+                dates[valid].tolist(), opens[valid].tolist(), highs[valid].tolist(),
+                lows[valid].tolist(), closes[valid].tolist(), volumes[valid].tolist()
+            )
+        ]
+        print(f"[BVCscrap] Processed {len(table)} rows, {len(historical_data)} valid for {symbol}")
+        return historical_data
+
+    @staticmethod
+    def _historical_cache_path(filepath):
+        return os.path.splitext(filepath)[0] + '.npy'
+
+    def _load_historical_cache(self, filepath):
+        """Rows from the typed sidecar when it is at least as new as the CSV, else None"""
+        cache_path = self._historical_cache_path(filepath)
+        try:
+            if os.stat(cache_path).st_mtime_ns < os.stat(filepath).st_mtime_ns:
+                return None
+            table = np.load(cache_path, allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+
+        return [
+            {'date': date_str, 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+            for date_str, o, h, l, c, v in zip(
+                table['date'].tolist(), table['open'].tolist(), table['high'].tolist(),
+                table['low'].tolist(), table['close'].tolist(), table['volume'].tolist()
+            )
+        ]
+
+    def _write_historical_cache(self, filepath, historical_data):
+        """Store parsed rows as a structured .npy array so later reads skip CSV parsing"""
+        cache_path = self._historical_cache_path(filepath)
+        tmp_path = f"{cache_path}.tmp"
+        try:
+            table = np.array(
+                [(row['date'], row['open'], row['high'], row['low'], row['close'], row['volume']) for row in historical_data],
+                dtype=_HISTORICAL_DTYPE
+            )
+            with open(tmp_path, 'wb') as f:
+                np.save(f, table, allow_pickle=False)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            logger.exception(f"[BVCscrap] Error writing historical cache {cache_path}: {e}")
+
     def read_historical_data(self, symbol, timeframe='daily'):
         """Read historical data from CSV file with robust error handling"""
         try:
@@ -751,74 +1099,107 @@ class BVCscrap:
                 print(f"[BVCscrap] Historical data file not found: {filepath}")
                 return []
 
+            # Already parsed since the CSV was last written
+            historical_data = self._load_historical_cache(filepath)
+            if historical_data is not None:
+                return historical_data
+
+            # Well-formed files (the common case) are parsed and validated column-wise
+            historical_data = self._read_historical_columns(filepath, symbol)
+            if historical_data is not None:
+                self._write_historical_cache(filepath, historical_data)
+                return historical_data
+
+            # Otherwise fall back to the row-by-row parser; bad rows are counted and
+            # summarized once (per-row detail only at DEBUG level)
             historical_data = []
             row_count = 0
             valid_rows = 0
+            skipped_missing = skipped_date = skipped_numeric = skipped_non_positive = 0
+            high_warnings = low_warnings = 0
+            offending_rows = []  # First few skipped row numbers for the summary
+            debug = logger.isEnabledFor(logging.DEBUG)
+            required_fields = ('date', 'open', 'high', 'low', 'close', 'volume')
 
             with open(filepath, 'r', encoding='utf-8') as csvfile:
                 reader = csv.DictReader(csvfile)
                 for row_num, row in enumerate(reader, start=2):  # Start at 2 to account for header
                     row_count += 1
 
-                    try:
-                        # Validate required fields exist and are not empty
-                        required_fields = ['date', 'open', 'high', 'low', 'close', 'volume']
-                        if not all(field in row and row[field] and row[field].strip() for field in required_fields):
-                            print(f"[BVCscrap] Skipping row {row_num}: missing required fields - {row}")
-                            continue
+                    # Validate required fields exist and are not empty
+                    if not all(row.get(field) and row[field].strip() for field in required_fields):
+                        skipped_missing += 1
+                        if len(offending_rows) < 5:
+                            offending_rows.append(row_num)
+                        if debug:
+                            logger.debug(f"[BVCscrap] Skipping row {row_num}: missing required fields - {row}")
+                        continue
 
-                        # Parse and validate date
-                        date_str = row['date'].strip()
+                    # Parse and validate date
+                    date_str = row['date'].strip()
+                    if not is_iso_date(date_str):
                         try:
-                            # Try to parse the date to ensure it's valid
                             datetime.fromisoformat(date_str)
                         except ValueError as e:
-                            print(f"[BVCscrap] Skipping row {row_num}: invalid date format '{date_str}' - {e}")
+                            skipped_date += 1
+                            if len(offending_rows) < 5:
+                                offending_rows.append(row_num)
+                            if debug:
+                                logger.debug(f"[BVCscrap] Skipping row {row_num}: invalid date format '{date_str}' - {e}")
                             continue
 
-                        # Parse and validate numeric fields
-                        try:
-                            open_price = float(row['open'].strip())
-                            high_price = float(row['high'].strip())
-                            low_price = float(row['low'].strip())
-                            close_price = float(row['close'].strip())
-                            volume = int(float(row['volume'].strip()))  # Handle float strings that should be int
-
-                            # Validate OHLC relationships
-                            if high_price < max(open_price, close_price):
-                                print(f"[BVCscrap] Warning: row {row_num} high ({high_price}) < max(open,close) ({max(open_price, close_price)})")
-                            if low_price > min(open_price, close_price):
-                                print(f"[BVCscrap] Warning: row {row_num} low ({low_price}) > min(open,close) ({min(open_price, close_price)})")
-
-                            # Ensure positive values
-                            if any(val <= 0 for val in [open_price, high_price, low_price, close_price, volume]):
-                                print(f"[BVCscrap] Skipping row {row_num}: non-positive values - {row}")
-                                continue
-
-                        except (ValueError, TypeError) as e:
-                            print(f"[BVCscrap] Skipping row {row_num}: invalid numeric data - {e}")
-                            continue
+                    # Parse and validate numeric fields
+                    try:
+                        open_price = float(row['open'])
+                        high_price = float(row['high'])
+                        low_price = float(row['low'])
+                        close_price = float(row['close'])
+                        volume = int(float(row['volume']))  # Handle float strings that should be int
+                    except (ValueError, TypeError) as e:
+                        skipped_numeric += 1
+                        if len(offending_rows) < 5:
+                            offending_rows.append(row_num)
+                        if debug:
+                            logger.debug(f"[BVCscrap] Skipping row {row_num}: invalid numeric data - {e}")
+                        continue
 
-                        historical_data.append({
-                            'date': date_str,
-                            'open': open_price,
-                            'high': high_price,
-                            'low': low_price,
-                            'close': close_price,
-                            'volume': volume
-                        })
+                    # Ensure positive values
+                    if open_price <= 0 or high_price <= 0 or low_price <= 0 or close_price <= 0 or volume <= 0:
+                        skipped_non_positive += 1
+                        if len(offending_rows) < 5:
+                            offending_rows.append(row_num)
+                        if debug:
+                            logger.debug(f"[BVCscrap] Skipping row {row_num}: non-positive values - {row}")
+                        continue
 
-                        valid_rows += 1
+                    # Validate OHLC relationships (warnings only)
+                    if high_price < open_price or high_price < close_price:
+                        high_warnings += 1
+                    if low_price > open_price or low_price > close_price:
+                        low_warnings += 1
 
-                    except Exception as e:
-                        print(f"[BVCscrap] Error processing row {row_num}: {e} - {row}")
-                        continue
+                    historical_data.append({
+                        'date': date_str,
+                        'open': open_price,
+                        'high': high_price,
+                        'low': low_price,
+                        'close': close_price,
+                        'volume': volume
+                    })
+                    valid_rows += 1
 
+            if high_warnings or low_warnings:
+                print(f"[BVCscrap] Warning: {high_warnings} rows with high < max(open,close), "
+                      f"{low_warnings} rows with low > min(open,close) in {filepath}")
+            skipped = row_count - valid_rows
+            if skipped:
+                print(f"[BVCscrap] Skipped {skipped} rows in {filepath} (missing fields: {skipped_missing}, "
+                      f"bad date: {skipped_date}, bad number: {skipped_numeric}, non-positive: {skipped_non_positive}); "
+                      f"first rows: {offending_rows}")
             print(f"[BVCscrap] Processed {row_count} rows, {valid_rows} valid for {symbol}")
+            self._write_historical_cache(filepath, historical_data)
             return historical_data
 
         except Exception as e:
-            print(f"[BVCscrap] Error reading historical data: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception(f"[BVCscrap] Error reading historical data: {e}")
             return []
@@ -0,0 +1,19 @@
+"""Cheap wall-clock helpers for hot paths"""
+from datetime import datetime
+import threading
+import time
+
+_lock = threading.Lock()
+_last_sec = None
+_last_iso = None
+
+def now_iso():
+    """Return the current UTC time as an ISO string, regenerated once per second"""
+    global _last_sec, _last_iso
+    sec = int(time.time())
+    if sec != _last_sec:
+        with _lock:
+            if sec != _last_sec:
+                _last_iso = datetime.utcfromtimestamp(sec).isoformat()
+                _last_sec = sec
+    return _last_iso
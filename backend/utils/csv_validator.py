@@ -2,13 +2,108 @@
 """CSV Data Validator for Trading Platform"""
 
 import csv
+import mmap
 import os
-from datetime import datetime
+import re
+import stat
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
+
+from utils._njit import njit
+
+OHLC_COLUMNS = ('date', 'open', 'high', 'low', 'close', 'volume')
+# Common ISO-8601 shapes ('2024-01-31', '2024-01-31T09:30:00'); only a shape check, see is_iso_date
+ISO_DATE_RE = re.compile(r'[0-9]{4}-(?:0[1-9]|1[0-2])-(?:0[1-9]|[12][0-9]|3[01])(?:T(?:[01][0-9]|2[0-3]):[0-5][0-9]:[0-5][0-9])?')
+# Plain decimal tokens repair_csv_file normalizes, e.g. '12', '-3.5', '.25'
+_NUMERIC_RE = re.compile(r'-?(?:[0-9]+\.?[0-9]*|\.[0-9]+)')
+_OHLC_DTYPE = np.dtype([('date', 'U32'), ('open', 'f8'), ('high', 'f8'), ('low', 'f8'), ('close', 'f8'), ('volume', 'f8')])
+
+def is_iso_date(date_str: str) -> bool:
+    """True for 'YYYY-MM-DD' / 'YYYY-MM-DDTHH:MM:SS' strings naming a real calendar day"""
+    if not ISO_DATE_RE.fullmatch(date_str):
+        return False
+    try:
+        date.fromisoformat(date_str[:10])  # Rejects 2023-02-29, 2024-04-31, ...
+    except ValueError:
+        return False
+    return True
+
+# Character positions in 'YYYY-MM-DDTHH:MM:SS'
+_DATE_DIGITS = [0, 1, 2, 3, 5, 6, 8, 9]
+_TIME_DIGITS = [11, 12, 14, 15, 17, 18]
+
+def iso_date_mask(dates: np.ndarray) -> np.ndarray:
+    """Vectorized is_iso_date over an array of stripped date strings; one bool per row"""
+    lengths = np.char.str_len(dates)
+    # One row of 19 code points per date (shorter strings are zero-padded)
+    codes = dates.astype('U19').view(np.uint32).reshape(len(dates), 19)
+    digits = (codes >= ord('0')) & (codes <= ord('9'))
+    values = codes.astype(np.int64) - ord('0')
+
+    def number(*positions):
+        result = np.zeros(len(dates), dtype=np.int64)
+        for pos in positions:
+            result = result * 10 + values[:, pos]
+        return result
+
+    mask = (
+        ((lengths == 10) | (lengths == 19))
+        & digits[:, _DATE_DIGITS].all(axis=1)
+        & (codes[:, 4] == ord('-')) & (codes[:, 7] == ord('-'))
+    )
+    time_ok = (
+        digits[:, _TIME_DIGITS].all(axis=1)
+        & (codes[:, 10] == ord('T')) & (codes[:, 13] == ord(':')) & (codes[:, 16] == ord(':'))
+        & (number(11, 12) < 24) & (number(14, 15) < 60) & (number(17, 18) < 60)
+    )
+    mask &= (lengths != 19) | time_ok
+
+    # The day must exist in that month (date.fromisoformat semantics, years 1-9999)
+    year, month, day = number(0, 1, 2, 3), number(5, 6), number(8, 9)
+    mask &= (year >= 1) & (month >= 1) & (month <= 12) & (day >= 1)
+    first = ((np.where(mask, year, 1970) - 1970) * 12 + np.clip(month, 1, 12) - 1).astype('datetime64[M]')
+    days_in_month = ((first + 1).astype('datetime64[D]') - first.astype('datetime64[D]')).astype(np.int64)
+    return mask & (day <= days_in_month)
+
+def load_ohlc_columns(filepath: str, exact_header: bool = False) -> Optional[np.ndarray]:
+    """Parse a well-formed OHLC CSV column-wise in one C-level pass (numpy.loadtxt).
+
+    Returns a structured array with the OHLC_COLUMNS fields, or None when the file
+    needs the row-by-row path (missing columns, ragged or quoted rows, blank or
+    non-numeric values). With exact_header the header must be exactly OHLC_COLUMNS,
+    so every row is also checked to have that many columns.
+    """
+    with open(filepath, 'r', encoding='utf-8', newline='') as f:
+        header = next(csv.reader(f), None)
+        if not header or any(col not in header for col in OHLC_COLUMNS):
+            return None
+        if exact_header and tuple(header) != OHLC_COLUMNS:
+            return None
+        usecols = None if exact_header else [header.index(col) for col in OHLC_COLUMNS]
+        try:
+            return np.loadtxt(f, dtype=_OHLC_DTYPE, delimiter=',', comments=None, usecols=usecols, ndmin=1)
+        except ValueError:
+            return None
+
+@njit(cache=True)
+def _validate_ohlc(o, h, l, c, v, out):
+    """Fill out[i] with whether row i passes the price, volume and OHLC checks"""
+    for i in range(o.shape[0]):
+        out[i] = (
+            o[i] > 0 and h[i] > 0 and l[i] > 0 and c[i] > 0
+            and v[i] > -1.0  # int(float(volume)) >= 0
+            and h[i] >= max(o[i], c[i]) and l[i] <= min(o[i], c[i])
+        )
+
 class CSVValidator:
     """Validates OHLC CSV data for trading platforms"""
 
+    max_errors = 10  # Rows stop being checked once this many errors are collected
+
     def __init__(self, data_dir: str = 'data'):
         self.data_dir = data_dir
         self.required_columns = ['date', 'open', 'high', 'low', 'close', 'volume']
@@ -20,6 +115,14 @@ class CSVValidator:
         if not os.path.exists(filepath):
             return False, [f"File does not exist: {filepath}"]
 
+        # Clean files pass on column-wise checks alone; anything flagged is re-checked
+        # row by row below to produce the exact error messages
+        try:
+            if self._line_shape_regular(filepath) and self._columns_valid(filepath):
+                return True, []
+        except Exception:
+            pass
+
         try:
             with open(filepath, 'r', encoding='utf-8') as f:
                 # Check header
@@ -41,6 +144,11 @@ class CSVValidator:
                 # Validate data rows
                 row_num = 1  # Start after header
                 for row in reader:
+                    if len(errors) >= self.max_errors:
+                        remaining = 1 + sum(1 for _ in reader)
+                        errors = errors[:self.max_errors] + [f"... and {remaining} more rows not checked"]
+                        return False, errors
+
                     row_num += 1
 
                     if len(row) != len(header):
@@ -56,14 +164,15 @@ class CSVValidator:
                         errors.append(f"Row {row_num}: Missing date")
                         continue
 
-                    try:
-                        # Try to parse date
-                        if 'T' not in date_str:
-                            date_str += 'T00:00:00'
-                        datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                    except ValueError:
-                        errors.append(f"Row {row_num}: Invalid date format '{date_str}'")
-                        continue
+                    if not is_iso_date(date_str):
+                        try:
+                            # Try to parse date
+                            if 'T' not in date_str:
+                                date_str += 'T00:00:00'
+                            datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+                        except ValueError:
+                            errors.append(f"Row {row_num}: Invalid date format '{date_str}'")
+                            continue
 
                     # Validate numeric fields
                     for field in ['open', 'high', 'low', 'close']:
@@ -99,89 +208,132 @@ class CSVValidator:
         except Exception as e:
             return False, [f"File read error: {str(e)}"]
 
-        max_errors = 10
-        if len(errors) > max_errors:
-            errors = errors[:max_errors] + [f"... and {len(errors) - max_errors} more errors"]
+        if len(errors) > self.max_errors:
+            errors = errors[:self.max_errors] + [f"... and {len(errors) - self.max_errors} more errors"]
 
         return len(errors) == 0, errors
 
+    def _line_shape_regular(self, filepath: str) -> bool:
+        """Byte-level pre-scan over an mmap: no quoting and the header's field count on every line"""
+        with open(filepath, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return False
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                buf = np.frombuffer(mm, dtype=np.uint8)
+                try:
+                    if np.any(buf == ord('"')):
+                        return False
+
+                    # Line starts from newline positions (numpy's vectorized compare, no per-line Python)
+                    newlines = np.flatnonzero(buf == ord('\n'))
+                    starts = np.concatenate(([0], newlines + 1))
+                    starts = starts[starts < len(buf)]
+                    ends = np.append(starts[1:], len(buf))
+
+                    commas = np.add.reduceat((buf == ord(',')).view(np.uint8), starts)
+                    # Ignore blank lines ('\n' or '\r\n'), which csv.reader skips as well
+                    lengths = ends - starts
+                    lengths = lengths - (buf[ends - 1] == ord('\n'))
+                    lengths = lengths - (buf[np.maximum(ends - 2, starts)] == ord('\r'))
+                    return bool(np.all(commas[lengths > 0] == commas[0]))
+                finally:
+                    del buf
+
+    def _columns_valid(self, filepath: str) -> bool:
+        """True when every row passes the checks of validate_csv_file, evaluated on whole columns"""
+        table = load_ohlc_columns(filepath, exact_header=True)
+        if table is None:
+            return False
+
+        # Same dates as the row path's is_iso_date; anything else is left to the row loop
+        if not np.all(iso_date_mask(np.char.strip(table['date']))):
+            return False
+
+        # Structured-array fields are strided views; the kernel wants contiguous columns
+        o, h, l, c, v = (np.ascontiguousarray(table[col]) for col in OHLC_COLUMNS[1:])
+        row_ok = np.empty(len(table), dtype=np.bool_)
+        _validate_ohlc(o, h, l, c, v, row_ok)
+        return bool(row_ok.all())
+
     def validate_all_csvs(self) -> Dict[str, Tuple[bool, List[str]]]:
-        """Validate all CSV files in data directory"""
-        results = {}
+        """Validate all CSV files in data directory (files are checked in parallel processes)"""
+        keys = []
+        filepaths = []
 
-        # Check current data CSVs
+        # Current data CSVs
         for market in ['stocks', 'forex', 'crypto', 'morocco']:
             filename = f'market_data_{market}.csv'
             filepath = os.path.join(self.data_dir, filename)
 
             if os.path.exists(filepath):
-                is_valid, errors = self.validate_csv_file(filepath)
-                results[f'current_{market}'] = (is_valid, errors)
+                keys.append(f'current_{market}')
+                filepaths.append(filepath)
 
-        # Check historical data CSVs
+        # Historical data CSVs
         historical_dir = os.path.join(self.data_dir, 'historical')
         if os.path.exists(historical_dir):
             for filename in os.listdir(historical_dir):
                 if filename.endswith('.csv'):
-                    filepath = os.path.join(historical_dir, filename)
-                    is_valid, errors = self.validate_csv_file(filepath)
-                    results[f'historical_{filename}'] = (is_valid, errors)
+                    keys.append(f'historical_{filename}')
+                    filepaths.append(os.path.join(historical_dir, filename))
 
-        return results
+        if len(filepaths) < 2:
+            return {key: self.validate_csv_file(path) for key, path in zip(keys, filepaths)}
+
+        workers = min(os.cpu_count() or 1, len(filepaths))
+        chunksize = max(1, len(filepaths) // (4 * workers))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return dict(zip(keys, executor.map(self.validate_csv_file, filepaths, chunksize=chunksize)))
 
     def repair_csv_file(self, filepath: str) -> bool:
-        """Attempt to repair common CSV issues"""
+        """Attempt to repair common CSV issues (streamed line by line into a temp file)"""
+        tmp_path = None
         try:
-            # Read all lines
-            with open(filepath, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-
-            if not lines:
-                return False
-
-            # Parse header
-            header = lines[0].strip().split(',')
-            if len(header) < len(self.required_columns):
-                print(f"Cannot repair {filepath}: insufficient columns in header")
-                return False
-
-            # Clean and repair data rows
-            repaired_lines = [lines[0]]  # Keep header
-
-            for i, line in enumerate(lines[1:], 1):
-                if not line.strip():
-                    continue  # Skip empty lines
-
-                parts = line.strip().split(',')
-                if len(parts) != len(header):
-                    print(f"Skipping line {i}: incorrect column count")
-                    continue
-
-                # Basic cleaning
-                cleaned_parts = []
-                for part in parts:
-                    part = part.strip()
-                    # Remove quotes if present
-                    if part.startswith('"') and part.endswith('"'):
-                        part = part[1:-1]
-                    # Basic numeric validation
-                    if part and part.replace('.', '').replace('-', '').isdigit():
-                        try:
-                            # Ensure proper formatting
-                            if '.' in part:
-                                float(part)  # Validate
+            with open(filepath, 'r', encoding='utf-8') as f_in:
+                header_line = f_in.readline()
+                if not header_line:
+                    return False
+
+                # Parse header
+                header = header_line.strip().split(',')
+                if len(header) < len(self.required_columns):
+                    print(f"Cannot repair {filepath}: insufficient columns in header")
+                    return False
+
+                with tempfile.NamedTemporaryFile('w', encoding='utf-8', newline='', dir=os.path.dirname(filepath) or '.',
+                                                 suffix='.tmp', delete=False) as f_out:
+                    tmp_path = f_out.name
+                    f_out.write(header_line)  # Keep header
+
+                    # Clean and repair data rows
+                    for i, line in enumerate(f_in, 1):
+                        if not line.strip():
+                            continue  # Skip empty lines
+
+                        parts = line.strip().split(',')
+                        if len(parts) != len(header):
+                            print(f"Skipping line {i}: incorrect column count")
+                            continue
+
+                        # Basic cleaning
+                        cleaned_parts = []
+                        for part in parts:
+                            part = part.strip()
+                            # Remove quotes if present
+                            if part.startswith('"') and part.endswith('"'):
+                                part = part[1:-1]
+                            # Ensure proper formatting of decimals (integers are kept as-is)
+                            if '.' in part and _NUMERIC_RE.fullmatch(part):
                                 part = f"{float(part):.4f}"
-                            else:
-                                int(part)  # Validate
-                        except:
-                            pass
-                    cleaned_parts.append(part)
+                            cleaned_parts.append(part)
 
-                repaired_lines.append(','.join(cleaned_parts) + '\n')
+                        f_out.write(','.join(cleaned_parts) + '\n')
 
-            # Write back
-            with open(filepath, 'w', encoding='utf-8', newline='') as f:
-                f.writelines(repaired_lines)
+            # Swap in the repaired file atomically, keeping the original's permissions
+            # (NamedTemporaryFile creates it owner-only)
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(filepath).st_mode))
+            os.replace(tmp_path, filepath)
+            tmp_path = None
 
             print(f"Repaired {filepath}")
             return True
@@ -189,6 +341,9 @@ class CSVValidator:
         except Exception as e:
             print(f"Failed to repair {filepath}: {e}")
             return False
+        finally:
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
 
 if __name__ == "__main__":
     validator = CSVValidator()
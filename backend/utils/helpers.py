@@ -1,17 +1,23 @@
 from functools import wraps
-from flask import jsonify
+from flask import g, jsonify
 from flask_jwt_extended import get_jwt_identity
 from models import User
 
 def get_current_user():
-    """Get current authenticated user"""
+    """Get current authenticated user (looked up once per request and kept on flask.g)"""
     user_id = get_jwt_identity()
+    cached = g.get('_current_user')
+    if cached is not None and cached[0] == user_id:
+        return cached[1]
+
+    user = None
     if user_id:
         try:
-            return User.query.get(int(user_id))
+            user = User.query.get(int(user_id))
         except (ValueError, TypeError):
-            return User.query.get(user_id)
-    return None
+            user = User.query.get(user_id)
+    g._current_user = (user_id, user)
+    return user
 
 def require_role(*roles):
     """Decorator to require specific user roles"""
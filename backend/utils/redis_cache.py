@@ -0,0 +1,59 @@
+"""Optional Redis-backed cache shared across worker processes"""
+import logging
+import threading
+
+import orjson
+
+from config import Config
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_client_lock = threading.Lock()
+_client_checked = False
+
+
+def get_redis():
+    """Return the shared Redis client, or None when Redis is not configured"""
+    global _client, _client_checked
+    if _client_checked:
+        return _client
+    with _client_lock:
+        if not _client_checked:
+            if REDIS_AVAILABLE and Config.REDIS_URL:
+                _client = redis.Redis.from_url(
+                    Config.REDIS_URL, socket_timeout=0.5, socket_connect_timeout=0.5
+                )
+            _client_checked = True
+    return _client
+
+
+def cache_get(key):
+    """Load a JSON value from Redis; None on miss or when Redis is unreachable"""
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        raw = client.get(key)
+    except redis.RedisError as e:
+        logger.info("[RedisCache] GET %s failed: %s", key, e)
+        return None
+    return orjson.loads(raw) if raw is not None else None
+
+
+def cache_set(key, value, ttl):
+    """Store a JSON value in Redis with a TTL; failures are logged and ignored"""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        client.set(key, orjson.dumps(value), ex=ttl)
+    except redis.RedisError as e:
+        logger.info("[RedisCache] SET %s failed: %s", key, e)
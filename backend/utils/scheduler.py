@@ -1,8 +1,15 @@
-from threading import Thread
-import time
+from threading import Event, Thread
 from datetime import datetime, date
+import logging
+import logging.handlers
+import queue
+from sqlalchemy import update
 from extensions import db
 from models import UserChallenge
+from services.risk_engine import RiskEngine
+from utils.bvcscrap import BVCscrap, MARKET_TYPES
+
+logger = logging.getLogger(__name__)
 
 class ChallengeScheduler:
     """Background scheduler for challenge evaluations"""
@@ -11,101 +18,104 @@ class ChallengeScheduler:
         self.app = app
         self.running = False
         self.thread = None
+        self.interval = 60  # Seconds between ticks
+        self._stop_event = Event()
+        self._last_reset_day = None
+        self._log_listener = None
+        self.scrapers = None
     
     def init_app(self, app):
         """Initialize with Flask app"""
         self.app = app
+        # Market data scrapers for all markets, created once and reused every tick
+        self.scrapers = [BVCscrap(market_type=market_type) for market_type in MARKET_TYPES]
+        # Status lines are INFO, as the prints they replaced; keep them in production too
+        logger.setLevel(logging.INFO)
+    
+    def _start_log_listener(self):
+        """Route scheduler logs through a queue so stream I/O happens off the tick thread"""
+        log_queue = queue.Queue(-1)
+        self._log_listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+        self._log_listener.start()
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        logger.propagate = False
     
     def start(self):
         """Start scheduler thread"""
         if not self.running:
             self.running = True
+            self._stop_event.clear()
+            if self._log_listener is None:
+                self._start_log_listener()
             self.thread = Thread(target=self._run, daemon=True)
             self.thread.start()
     
     def stop(self):
         """Stop scheduler thread"""
         self.running = False
+        self._stop_event.set()  # Wakes the loop immediately instead of after the current sleep
         if self.thread:
             self.thread.join()
+        if self._log_listener is not None:
+            self._log_listener.stop()  # Flushes queued records
+            self._log_listener = None
+            for handler in [h for h in logger.handlers if isinstance(h, logging.handlers.QueueHandler)]:
+                logger.removeHandler(handler)
+            logger.propagate = True
     
     def _run(self):
         """Main scheduler loop"""
-        from services.risk_engine import RiskEngine
-        from services.challenge_engine import ChallengeEngine
-        from utils.bvcscrap import BVCscrap
-        
-        # Initialize market data scrapers for all markets
-        stocks_scraper = BVCscrap(market_type='stocks')
-        forex_scraper = BVCscrap(market_type='forex')
-        crypto_scraper = BVCscrap(market_type='crypto')
-        morocco_scraper = BVCscrap(market_type='morocco')
+        if self.scrapers is None:
+            self.scrapers = [BVCscrap(market_type=market_type) for market_type in MARKET_TYPES]
+        risk_engine = RiskEngine()
         
         # Scrape immediately on startup
         try:
-            print("[Scheduler] Initial market data scrape (all markets)...")
-            stocks_scraper.scrape_and_save()
-            forex_scraper.scrape_and_save()
-            crypto_scraper.scrape_and_save()
-            morocco_scraper.scrape_and_save()
+            logger.info("[Scheduler] Initial market data scrape (all markets)...")
+            BVCscrap.scrape_and_save_all(self.scrapers)
         except Exception as e:
-            print(f"[Scheduler] Initial scrape error: {e}")
+            logger.error(f"[Scheduler] Initial scrape error: {e}")
         
         while self.running:
             try:
                 with self.app.app_context():
                     # Refresh all market data CSVs every minute
                     try:
-                        print("[Scheduler] Refreshing all market data CSVs...")
-                        stocks_scraper.scrape_and_save()
-                        forex_scraper.scrape_and_save()
-                        crypto_scraper.scrape_and_save()
-                        morocco_scraper.scrape_and_save()
+                        logger.info("[Scheduler] Refreshing all market data CSVs...")
+                        BVCscrap.scrape_and_save_all(self.scrapers)
                     except Exception as e:
-                        print(f"[Scheduler] Market data refresh error: {e}")
+                        logger.error(f"[Scheduler] Market data refresh error: {e}")
                     
-                    # Reset daily loss for new day
-                    self._reset_daily_loss_if_new_day()
+                    # Reset daily loss once per calendar day rather than querying every tick
+                    today = date.today()
+                    if today != self._last_reset_day:
+                        self._reset_daily_loss_if_new_day()
+                        self._last_reset_day = today
                     
-                    # Evaluate all active challenges
-                    active_challenges = UserChallenge.query.filter_by(status='active').all()
-                    risk_engine = RiskEngine()
-                    challenge_engine = ChallengeEngine()
-                    
-                    for challenge in active_challenges:
-                        try:
-                            # Evaluate risk rules
-                            evaluation = risk_engine.evaluate_challenge(challenge)
-                            
-                            if evaluation['status'] != 'active':
-                                challenge_engine.update_challenge_status(
-                                    challenge.id,
-                                    evaluation['status'],
-                                    evaluation.get('reason', '')
-                                )
-                        except Exception as e:
-                            print(f"Error evaluating challenge {challenge.id}: {str(e)}")
+                    # Evaluate all active challenges in a single UPDATE
+                    changed = risk_engine.evaluate_all_active(commit=False)
+                    if changed:
+                        logger.info(f"[Scheduler] {changed} challenge(s) passed or failed")
                     
+                    # Single commit for every status change in this tick
                     db.session.commit()
             except Exception as e:
-                print(f"Scheduler error: {str(e)}")
+                logger.error(f"Scheduler error: {str(e)}")
             
-            # Sleep for 60 seconds
-            time.sleep(60)
+            # Wait for the next tick; returns early when stop() is called
+            self._stop_event.wait(self.interval)
     
     def _reset_daily_loss_if_new_day(self):
         """Reset daily loss if it's a new day"""
         today = date.today()
         
-        challenges = UserChallenge.query.filter(
-            UserChallenge.status == 'active',
-            UserChallenge.current_day < today
-        ).all()
-        
-        for challenge in challenges:
-            challenge.current_day = today
-            challenge.daily_loss = 0.0
-        
+        # One UPDATE statement instead of loading and dirtying every challenge
+        db.session.execute(
+            update(UserChallenge)
+            .where(UserChallenge.status == 'active', UserChallenge.current_day < today)
+            .values(current_day=today, daily_loss=0.0)
+            .execution_options(synchronize_session=False)
+        )
         db.session.commit()
 
 # Global scheduler instance